@@ -1,23 +1,53 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, Response, Request
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, Response, Request, HTTPException, Query, Body
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from typing import List, Optional, Literal
 import asyncio
+import logging
 import os
 
 from .stt.base import STTEvent, STTAdapter, get_stt_adapter
-from .storage import db, models, crud
+from .storage import db, async_crud, migrations
+from .storage.pool import pool_status
+from .summary import ollama_client
+from .summary.admission import llm_admission
+from .summary.base import get_summary_adapter
+from .summary.batch import batch_runner
+from .summary.breaker import llm_breaker
+from .summary.cache import summary_cache
+from .summary.jobs import QueueFullError, summary_jobs
+from .summary.prompts import prompt_stats
+from .summary.registry import UnknownProviderError, default_provider, is_inline, summary_adapters
+from .summary.schema import parse_stats
+from .summary.speculative import speculates
+from .summary.streaming import summary_events
+from .summary.warmup import model_warmer
+from .summary.ws_manager import websocket_endpoint as summary_websocket_endpoint
 from .forms.ws import websocket_endpoint
 from .forms.ws_manager import form_ws_manager
 
+# uvicorn only sets up its own loggers; without a handler the app's INFO lines (prompt sizes,
+# breaker transitions, model warm-up) are dropped. LOG_LEVEL adjusts it (default INFO).
+if not logging.getLogger().handlers and not logging.getLogger("app").handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(levelname)s:     %(name)s - %(message)s"))
+    logging.getLogger("app").addHandler(_log_handler)
+logging.getLogger("app").setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+# SQLAlchemy logs under the module of our pool classes; keep its pool chatter at the usual level
+logging.getLogger("app.storage.pool").setLevel(logging.WARNING)
+
 app = FastAPI(title="Voice AI Pre-Care")
 
+MAX_BATCH_STEPS = int(os.getenv("MAX_BATCH_STEPS", "200"))
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins for now
     allow_credentials=False,  # Set to False when allowing all origins
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Add manual CORS handling as backup
@@ -27,6 +57,7 @@ async def add_cors_headers(request: Request, call_next):
     response.headers["Access-Control-Allow-Origin"] = "*"
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
     response.headers["Access-Control-Allow-Headers"] = "*"
+    response.headers["Access-Control-Expose-Headers"] = "X-Next-Cursor"
     return response
 
 
@@ -36,13 +67,32 @@ class CreateSessionOut(BaseModel):
 
 @app.on_event("startup")
 async def startup() -> None:
-    models.Base.metadata.create_all(db.engine)
+    # Schema changes are applied by `python -m app.storage.migrations`; workers only verify the version
+    migrations.check(db.engine)
+    await ollama_client.start()
+    summary_adapters.load()
+    adapter = get_summary_adapter()
+    if hasattr(adapter, "model"):
+        # Only the LLM adapters have a model to load; with LLM_PROVIDER=rule-based Ollama is left alone
+        await model_warmer.start(adapter.base_url, adapter.model)
+    await summary_jobs.start()
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await summary_jobs.stop()
+    await model_warmer.stop()
+    await ollama_client.close()
+    await db.async_engine.dispose()
+    if db.async_read_engine is not db.async_engine:
+        await db.async_read_engine.dispose()
 
 
 @app.post("/api/intake/sessions", response_model=CreateSessionOut)
 async def create_session() -> CreateSessionOut:
-    session = crud.create_session(db.SessionLocal())
-    return CreateSessionOut(sessionId=session.session_id)
+    async with db.AsyncSessionLocal() as session:
+        obj = await async_crud.create_session(session)
+    return CreateSessionOut(sessionId=obj.session_id)
 
 
 StepLiteral = Literal[
@@ -66,40 +116,202 @@ class StepIn(BaseModel):
 
 @app.post("/api/intake/{session_id}/step")
 async def save_step(session_id: str, body: StepIn):
-    with db.SessionLocal() as session:
-        crud.save_step(session, session_id=session_id, step=body.step, text=body.text, language=body.language, confirmed=body.confirmed)
+    async with db.AsyncSessionLocal() as session:
+        await async_crud.save_step(session, session_id=session_id, step=body.step, text=body.text, language=body.language, confirmed=body.confirmed)
     return {"ok": True}
 
 
+@app.post("/api/intake/{session_id}/steps")
+async def save_steps(session_id: str, body: List[StepIn] = Body(max_length=MAX_BATCH_STEPS)):
+    """Save an ordered batch of steps in one transaction; more than MAX_BATCH_STEPS is rejected with 422"""
+    async with db.AsyncSessionLocal() as session:
+        saved = await async_crud.save_steps(session, session_id, [step.model_dump() for step in body])
+    return {"ok": True, "saved": saved}
+
+
 @app.get("/api/intake/summaries")
-async def list_summaries():
-    """List all intake summaries for doctor dashboard"""
-    with db.SessionLocal() as session:
-        return crud.list_all_summaries(session)
+async def list_summaries(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    fresh: bool = False,
+):
+    """List intake summaries for doctor dashboard, newest first.
+
+    Pass the X-Next-Cursor response header back as ``cursor`` to fetch the next page.
+    Served from the read replica; ``fresh=true`` reads the primary instead.
+    """
+    async with db.read_session(fresh=fresh) as session:
+        try:
+            items, next_cursor = await async_crud.list_summaries_page(session, limit=limit, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+@app.get("/api/intake/summaries/search")
+async def search_summaries(
+    response: Response,
+    has_red_flags: Optional[bool] = None,
+    allergy: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    fresh: bool = False,
+):
+    """Dashboard listing filtered in SQL, e.g. ?has_red_flags=true or ?allergy=Penicillin"""
+    async with db.read_session(fresh=fresh) as session:
+        try:
+            items, next_cursor = await async_crud.search_summaries_page(
+                session, has_red_flags=has_red_flags, allergy=allergy, limit=limit, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @app.get("/api/intake/{session_id}")
-async def get_intake(session_id: str):
-    with db.SessionLocal() as session:
-        return crud.get_intake(session, session_id)
+async def get_intake(session_id: str, fresh: bool = False):
+    async with db.read_session(session_id, fresh=fresh) as session:
+        return await async_crud.get_intake(session, session_id)
+
+
+class SummaryBatchIn(BaseModel):
+    mode: Literal["missing", "all"] = "missing"
+    resume: bool = False
+    chunkSize: Optional[int] = Field(None, ge=1)
+    parallel: Optional[int] = Field(None, ge=1)
+
+
+@app.post("/api/intake/summaries/batch", status_code=202)
+async def start_summary_batch(payload: SummaryBatchIn):
+    """Start a background batch summarization; see app.summary.batch"""
+    options = {"mode": payload.mode, "resume": payload.resume}
+    if payload.chunkSize:
+        options["chunk_size"] = payload.chunkSize
+    if payload.parallel:
+        options["parallel"] = payload.parallel
+    try:
+        batch_runner.start(**options)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return batch_runner.status()
+
+
+@app.get("/api/intake/summaries/batch")
+async def summary_batch_status():
+    """Progress and throughput (sessions/sec) of the current or last batch"""
+    return batch_runner.status()
+
+
+@app.get("/api/intake/summary-jobs/{job_id}")
+async def get_summary_job(job_id: str):
+    job = summary_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown summary job")
+    return job.to_dict()
 
 
-@app.post("/api/intake/{session_id}/summary")
-async def generate_summary(session_id: str):
-    with db.SessionLocal() as session:
-        return crud.generate_summary(session, session_id)
+@app.get("/api/intake/summary/providers")
+async def summary_providers():
+    """Summary providers that can be passed as ``provider``; inline ones answer without a job"""
+    return {
+        "default": default_provider(),
+        "providers": [{"name": name, "inline": is_inline(summary_adapters.get(name))} for name in summary_adapters.names()],
+    }
+
+
+def _summary_adapter(provider: Optional[str]):
+    try:
+        return get_summary_adapter(provider)
+    except UnknownProviderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/intake/{session_id}/summary", status_code=202)
+async def generate_summary(session_id: str, response: Response, wait: bool = False, provider: Optional[str] = None):
+    """Queue summary generation and return the job, with a rule-based ``draft``, at once.
+
+    The summary is pushed on /api/intake/summary/ws when ready; ``wait=true`` returns it instead.
+    Inline providers such as ``rule-based`` skip the queue.
+    """
+    adapter = _summary_adapter(provider)
+    if is_inline(adapter):
+        async with db.AsyncSessionLocal() as session:
+            result = await async_crud.generate_summary(session, session_id, provider)
+        response.status_code = 200
+        return result
+    try:
+        job = summary_jobs.submit(session_id, provider)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not wait:
+        if job.draft is None and speculates(adapter):
+            async with db.AsyncSessionLocal() as session:
+                job.draft = await async_crud.draft_summary(session, session_id)
+        return job.to_dict()
+    await job.finished.wait()
+    if job.status == "error":
+        raise HTTPException(status_code=500, detail=job.error)
+    response.status_code = 200
+    return job.result
+
+
+@app.get("/api/intake/{session_id}/summary/stream")
+async def stream_summary(session_id: str, provider: Optional[str] = None):
+    """Generate a summary as server-sent events.
+
+    Emits a ``field`` event ({"field", "value"}) as each summary field is
+    completed by the model, then ``summary`` with the saved result.
+    """
+    _summary_adapter(provider)
+    return StreamingResponse(
+        summary_events(session_id, provider),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/intake/{session_id}/summary")
-async def get_saved_summary(session_id: str):
+async def get_saved_summary(session_id: str, fresh: bool = False):
     """Get saved summary and transcript for doctor review"""
-    with db.SessionLocal() as session:
-        result = crud.get_saved_summary(session, session_id)
+    async with db.read_session(session_id, fresh=fresh) as session:
+        result = await async_crud.get_saved_summary(session, session_id)
         if not result:
             return {"error": "Summary not found"}
         return result
 
 
+@app.get("/api/internal/db-pool")
+async def db_pool_metrics():
+    """Connection pool occupancy and checkout wait time, for sizing DB_POOL_* settings"""
+    pools = {
+        "async": pool_status(db.async_engine.sync_engine),
+        "sync": pool_status(db.engine),
+    }
+    if db.async_read_engine is not db.async_engine:
+        pools["async_read"] = pool_status(db.async_read_engine.sync_engine)
+    return pools
+
+
+@app.get("/api/internal/summary-metrics")
+async def summary_metrics():
+    """LLM summary cache, admission control (queue depth, wait time), circuit breaker state,
+    prompt sizes, model warmth (cold vs warm latency), output parsing and the summary job queue"""
+    return {
+        "cache": summary_cache.stats(),
+        "admission": llm_admission.stats(),
+        "breaker": llm_breaker.stats(),
+        "prompts": prompt_stats.stats(),
+        "model": model_warmer.stats(),
+        "parse": parse_stats.stats(),
+        "jobs": summary_jobs.stats(),
+    }
+
+
 @app.websocket("/api/voice/ws/stt")
 async def ws_stt(websocket: WebSocket):
     await websocket.accept()
@@ -115,6 +327,11 @@ async def ws_stt(websocket: WebSocket):
         await adapter.aclose()
 
 
+@app.websocket("/api/intake/summary/ws")
+async def ws_summary(websocket: WebSocket, session_id: str):
+    await summary_websocket_endpoint(websocket, session_id)
+
+
 @app.websocket("/api/forms/ws")
 async def ws_forms(websocket: WebSocket, reservation_id: str):
     await websocket_endpoint(websocket, reservation_id)
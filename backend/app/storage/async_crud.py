@@ -0,0 +1,304 @@
+"""Async counterparts of the crud helpers, used by the FastAPI handlers."""
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import base64
+from sqlalchemy import select, insert, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import db as database, models, partitions
+from .crud import (
+    SUMMARY_TIMEOUT, _dialect_insert, _upsert, log_llm_summary, provisional_result, summary_cards_select, summary_card_to_dict, summary_result,
+    summary_search_select, summary_steps_payload, summary_transcript, summary_upsert_statements,
+)
+from ..summary import incremental, speculative
+from ..summary.base import FallbackSummary, get_summary_adapter
+
+STEPS_PER_INSERT = 100  # 600 bind parameters, inside every driver's limit
+
+
+async def create_session(db: AsyncSession) -> models.IntakeSession:
+    obj = models.IntakeSession()
+    db.add(obj)
+    await db.commit()
+    await db.refresh(obj)
+    database.mark_written(obj.session_id)
+    return obj
+
+
+async def save_step(db: AsyncSession, session_id: str, step: str, text: str, language: str, confirmed: bool) -> None:
+    """Save one answer; a confirmed one also updates the provisional summary (see app.summary.incremental)"""
+    obj = models.IntakeStep(session_id=session_id, step=step, language=language, text=text, confirmed=confirmed)
+    db.add(obj)
+    if confirmed:
+        # Insert the step first: on SQLite that takes the write lock the summary update relies on
+        await db.flush()
+        await update_provisional_summary(db, session_id, [(step, text)], final=_finishes_intake([(step, confirmed)]))
+    await db.commit()
+    database.mark_written(session_id)
+    if incremental.reaches_llm_step([(step, confirmed)]):
+        incremental.schedule_llm_pass(session_id)
+
+
+async def save_steps(db: AsyncSession, session_id: str, steps: List[Dict[str, Any]]) -> int:
+    """Insert an ordered batch of steps with multi-row INSERTs and a single commit"""
+    if not steps:
+        return 0
+    # Spread timestamps by a microsecond so get_intake's created_at ordering keeps payload order
+    base = datetime.utcnow()
+    rows = [
+        {
+            "session_id": session_id,
+            "step": s["step"],
+            "language": s["language"],
+            "text": s["text"],
+            "confirmed": s["confirmed"],
+            "created_at": base + timedelta(microseconds=i),
+        }
+        for i, s in enumerate(steps)
+    ]
+    for i in range(0, len(rows), STEPS_PER_INSERT):
+        await db.execute(insert(models.IntakeStep).values(rows[i:i + STEPS_PER_INSERT]))
+    await update_provisional_summary(
+        db, session_id, [(s["step"], s["text"]) for s in steps if s["confirmed"]],
+        final=_finishes_intake([(s["step"], s["confirmed"]) for s in steps]),
+    )
+    await db.commit()
+    database.mark_written(session_id)
+    if incremental.reaches_llm_step((s["step"], s["confirmed"]) for s in steps):
+        incremental.schedule_llm_pass(session_id)
+    return len(rows)
+
+
+def _finishes_intake(steps: List[Tuple[str, bool]]) -> bool:
+    """Whether these (step, confirmed) saves reach LLM_STEP with an inline default provider, which makes no LLM pass"""
+    return incremental.reaches_llm_step(steps) and incremental.default_is_inline()
+
+
+async def update_provisional_summary(
+    db: AsyncSession, session_id: str, steps: List[Tuple[str, str]], final: bool = False,
+) -> None:
+    """Fold confirmed (step, text) answers into the session's provisional summary, in the caller's transaction.
+
+    Reads and rewrites one summary row instead of re-reading every step. The
+    row is locked first, so concurrent saves for a session merge one after the
+    other and never overwrite a summary that is not provisional. ``final``
+    saves the result as a finished summary.
+    """
+    if not incremental.ENABLED or not steps:
+        return
+    row = await _lock_summary(db, session_id)
+    if not incremental.is_provisional(row.structured_summary):
+        return
+    summary = dict(row.structured_summary)
+    transcript = incremental.fold_steps(row.complete_transcript, summary, steps)
+    result = summary_result(summary, session_id) if final else provisional_result(summary, session_id)
+    for stmt in summary_upsert_statements(db.bind.dialect.name, session_id, transcript, result, touch=final):
+        await db.execute(stmt)
+
+
+async def _lock_summary(db: AsyncSession, session_id: str):
+    """The session's summary row, created as an empty provisional one if missing, and locked.
+
+    A no-op DO UPDATE takes the row lock on Postgres (SQLite has the database
+    write lock from the step insert) and RETURNING hands back whichever row won,
+    so there is no window between creating and reading it.
+    """
+    summary_table = models.IntakeSummary
+    stmt = _dialect_insert(db.bind.dialect.name)(summary_table).values(
+        session_id=session_id, complete_transcript="", structured_summary={"provisional": True}, created_at=datetime.utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(index_elements=["session_id"], set_={"session_id": stmt.excluded.session_id})
+    return (await db.execute(
+        stmt.returning(summary_table.complete_transcript, summary_table.structured_summary)
+    )).one()
+
+
+async def load_steps(db: AsyncSession, session_ids: List[str]) -> Dict[str, List[models.IntakeStep]]:
+    """Steps of each session, archived ones included, oldest first"""
+    steps: Dict[str, List[models.IntakeStep]] = {sid: [] for sid in session_ids}
+    result = await db.execute(
+        select(models.IntakeStep)
+        .where(models.IntakeStep.session_id.in_(session_ids))
+        .order_by(models.IntakeStep.session_id, models.IntakeStep.created_at.asc())
+    )
+    for step in result.scalars():
+        steps[step.session_id].append(step)
+
+    # Steps from months past the retention window live in archive files
+    archives = await db.execute(
+        select(models.IntakeStepArchive.session_id, models.IntakeStepArchive.archive_path)
+        .where(models.IntakeStepArchive.session_id.in_(session_ids))
+    )
+    paths: Dict[str, List[str]] = {}
+    for session_id, path in archives.all():
+        paths.setdefault(session_id, []).append(path)
+    if paths:
+        archived = await asyncio.to_thread(
+            lambda: {sid: partitions.read_archived_steps(p, sid) for sid, p in paths.items()}
+        )
+        for session_id, records in archived.items():
+            steps[session_id] = [
+                models.IntakeStep(**{**r, "created_at": datetime.fromisoformat(r["created_at"])}) for r in records
+            ] + steps[session_id]
+    return steps
+
+
+async def get_intake(db: AsyncSession, session_id: str):
+    steps = (await load_steps(db, [session_id]))[session_id]
+    return {
+        "sessionId": session_id,
+        "steps": [
+            {"step": s.step, "text": s.text, "language": s.language, "confirmed": s.confirmed, "created_at": s.created_at.isoformat()}
+            for s in steps
+        ],
+    }
+
+
+async def generate_summary(db: AsyncSession, session_id: str, provider: Optional[str] = None):
+    """Summarize a session with the ``provider`` adapter (default LLM_PROVIDER) and upsert the result.
+
+    The adapter is awaited on the caller's loop, with no worker thread or
+    nested event loop. LLM providers run next to a rule-based draft, which
+    marks the ``agreed`` fields (see app.summary.speculative).
+    """
+    steps_payload, complete_transcript = await load_summary_input(db, session_id)
+
+    adapter = get_summary_adapter(provider)
+    print(f"🔍 DEBUG: Using summary adapter: {type(adapter).__name__}")
+    llm_task = asyncio.ensure_future(asyncio.wait_for(adapter.summarize(steps_payload), timeout=SUMMARY_TIMEOUT))
+    draft = await speculative.draft(steps_payload) if speculative.speculates(adapter) else None
+    try:
+        llm_summary = await llm_task
+        log_llm_summary(llm_summary)
+    except Exception as e:
+        print(f"🔍 DEBUG: LLM Summary error: {e}")
+        llm_summary = None
+
+    if draft is None:
+        return await save_summary(db, session_id, complete_transcript, llm_summary)
+    if llm_summary is None or isinstance(llm_summary, FallbackSummary):
+        # No model output, so nothing to agree with; the adapter's fallback is the same rules anyway
+        print("🔍 DEBUG: Saving the rule-based draft instead")
+        return await save_summary(db, session_id, complete_transcript, draft)
+    return await save_summary(db, session_id, complete_transcript, llm_summary, speculative.agreed_fields(draft, llm_summary))
+
+
+async def draft_summary(db: AsyncSession, session_id: str) -> Dict[str, Any]:
+    """Rule-based summary of the session as it stands, in the API shape, without saving it"""
+    steps_payload, _ = await load_summary_input(db, session_id)
+    return provisional_result(await speculative.draft(steps_payload), session_id)
+
+
+async def load_summary_input(db: AsyncSession, session_id: str) -> Tuple[List[Dict[str, Any]], str]:
+    """(adapter steps payload, complete transcript) for a session"""
+    steps = (await load_steps(db, [session_id]))[session_id]
+    # Hand the connection back to the pool before the caller waits on the LLM
+    await db.commit()
+    return summary_steps_payload(steps), summary_transcript(steps)
+
+
+async def save_summary(
+    db: AsyncSession, session_id: str, complete_transcript: str, llm_summary: Optional[Dict[str, Any]],
+    agreed: Optional[List[str]] = None,
+):
+    summary = summary_result(llm_summary, session_id)
+    if agreed is not None:
+        summary["agreed"] = agreed
+    # Upsert summary + dashboard card; safe against concurrent generation for the same session
+    for stmt in summary_upsert_statements(db.bind.dialect.name, session_id, complete_transcript, summary):
+        await db.execute(stmt)
+    await db.commit()
+    database.mark_written(session_id)
+    return summary
+
+
+async def get_saved_summary(db: AsyncSession, session_id: str):
+    """Retrieve saved summary and transcript for a session"""
+    result = await db.execute(select(models.IntakeSummary).where(models.IntakeSummary.session_id == session_id))
+    summary = result.scalars().first()
+    if not summary:
+        return None
+
+    return {
+        "session_id": summary.session_id,
+        "complete_transcript": summary.complete_transcript,
+        "structured_summary": summary.structured_summary,
+        "created_at": summary.created_at.isoformat()
+    }
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+async def list_summaries_page(db: AsyncSession, limit: int = 50, cursor: Optional[str] = None):
+    """One page of the dashboard listing, newest first.
+
+    Reads the denormalized intake_summary_cards rows, never the transcript or
+    summary JSON, so the cost does not grow with transcript length.
+    Keyset pagination on (created_at, id): each page seeks straight to the
+    previous page's last row, so deep pages cost the same as the first.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    card = models.IntakeSummaryCard
+    return await _keyset_page(db, summary_cards_select(), card.created_at, card.id, limit, cursor)
+
+
+async def search_summaries_page(
+    db: AsyncSession,
+    has_red_flags: Optional[bool] = None,
+    allergy: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    """Filtered dashboard listing; the filters run in SQL, not over loaded rows"""
+    summary = models.IntakeSummary
+    stmt = summary_search_select(db.bind.dialect.name, has_red_flags=has_red_flags, allergy=allergy)
+    return await _keyset_page(db, stmt, summary.created_at, summary.id, limit, cursor)
+
+
+async def _keyset_page(db: AsyncSession, stmt, created_col, id_col, limit: int, cursor: Optional[str]):
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(created_col, id_col) < (created_at, row_id))
+    # Fetch one extra row to learn whether another page exists
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [summary_card_to_dict(r) for r in rows], next_cursor
+
+
+async def list_all_summaries(db: AsyncSession, limit: int = 50):
+    """List all saved summaries for doctor review"""
+    items, _ = await list_summaries_page(db, limit=limit)
+    return items
+
+
+async def get_cached_summary(db: AsyncSession, cache_key: str) -> Optional[models.SummaryCacheEntry]:
+    return await db.get(models.SummaryCacheEntry, cache_key)
+
+
+async def put_cached_summary(db: AsyncSession, cache_key: str, model: str, summary: Dict[str, Any], llm_ms: float) -> None:
+    stmt = _upsert(_dialect_insert(db.bind.dialect.name), models.SummaryCacheEntry, "cache_key", stmt_values={
+        "cache_key": cache_key,
+        "model": model,
+        "summary": summary,
+        "llm_ms": llm_ms,
+        "created_at": datetime.utcnow(),
+    })
+    await db.execute(stmt)
+    await db.commit()
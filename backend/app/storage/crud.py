@@ -1,9 +1,17 @@
+from sqlalchemy import select, func, cast, literal, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH
 from sqlalchemy.orm import Session
 from datetime import datetime
-from . import models
+from typing import Any, Dict, List, Optional, Tuple
+from . import db as database, models
 from ..summary.base import get_summary_adapter
+import asyncio
+import os
 import re
 
+# Upper bound on one adapter call
+SUMMARY_TIMEOUT = float(os.getenv("SUMMARY_TIMEOUT", "30"))
+
 
 def create_session(db: Session) -> models.IntakeSession:
     obj = models.IntakeSession()
@@ -27,58 +35,67 @@ def get_intake(db: Session, session_id: str):
 
 
 def generate_summary(db: Session, session_id: str):
-    """Generate summary using LLM directly from conversation steps"""
-    steps = db.query(models.IntakeStep).filter(models.IntakeStep.session_id == session_id).all()
-    
-    # Build complete transcript from all confirmed steps
-    complete_transcript = []
-    for step in sorted(steps, key=lambda x: x.created_at):
-        if step.confirmed:
-            complete_transcript.append(f"[{step.step}] {step.text}")
-    
+    """Generate summary using LLM directly from conversation steps.
+
+    Sync entry point for scripts; it runs the adapter with asyncio.run, so it
+    must not be called from inside an event loop. The API uses
+    ``async_crud.generate_summary``.
+    """
+    steps = db.query(models.IntakeStep).filter(models.IntakeStep.session_id == session_id).order_by(models.IntakeStep.created_at.asc()).all()
+    complete_transcript = summary_transcript(steps)
     print(f"🔍 DEBUG: Complete transcript: {complete_transcript}")
-    
+
     # Use LLM to summarize the entire conversation
     adapter = get_summary_adapter()
     print(f"🔍 DEBUG: Using summary adapter: {type(adapter).__name__}")
-    
+
     try:
-        steps_payload = [
-            {"step": s.step, "text": s.text, "language": s.language, "confirmed": s.confirmed, "ts": s.created_at.isoformat()}
-            for s in steps
-        ]
-        print(f"🔍 DEBUG: Steps payload for LLM: {steps_payload}")
-        
-        llm_summary = None
-        # Adapter may be async; call defensively
-        import asyncio
-        try:
-            # Try to get the current event loop
-            loop = asyncio.get_running_loop()
-            # If we're in an async context, create a task
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, adapter.summarize(steps_payload))
-                llm_summary = future.result(timeout=30)
-        except RuntimeError:
-            # No event loop running, safe to use asyncio.run
-            llm_summary = asyncio.run(adapter.summarize(steps_payload))
-        
-        print(f"🔍 DEBUG: LLM Summary result: {llm_summary}")
-        if llm_summary:
-            print(f"📋 DEBUG: Complete LLM Summary Details:")
-            print(f"   - Patient Info: {llm_summary.get('patient_info', 'N/A')}")
-            print(f"   - Main Complaint: {llm_summary.get('main_complaint', 'N/A')}")
-            print(f"   - Symptom Onset: {llm_summary.get('symptom_onset', 'N/A')}")
-            print(f"   - Relevant History: {llm_summary.get('relevant_history', [])}")
-            print(f"   - Allergies: {llm_summary.get('allergies', [])}")
-            print(f"   - Red Flags: {llm_summary.get('red_flags', [])}")
+        llm_summary = asyncio.run(asyncio.wait_for(adapter.summarize(summary_steps_payload(steps)), timeout=SUMMARY_TIMEOUT))
+        log_llm_summary(llm_summary)
     except Exception as e:
         print(f"🔍 DEBUG: LLM Summary error: {e}")
         llm_summary = None
 
-    # Use LLM summary as the primary result, with fallbacks
-    result = {
+    result = summary_result(llm_summary, session_id)
+    print(f"🔍 DEBUG: Final result: {result}")
+
+    # Upsert summary + dashboard card; safe against concurrent generation for the same session
+    for stmt in summary_upsert_statements(db.get_bind().dialect.name, session_id, complete_transcript, result):
+        db.execute(stmt)
+    db.commit()
+    database.mark_written(session_id)
+    print(f"🔍 DEBUG: Upserted summary in database")
+
+    return result
+
+
+def summary_transcript(steps) -> str:
+    """Complete transcript from the confirmed steps, oldest first"""
+    return "\n".join(f"[{s.step}] {s.text}" for s in steps if s.confirmed)
+
+
+def summary_steps_payload(steps) -> List[Dict[str, Any]]:
+    return [
+        {"step": s.step, "text": s.text, "language": s.language, "confirmed": s.confirmed, "ts": s.created_at.isoformat()}
+        for s in steps
+    ]
+
+
+def log_llm_summary(llm_summary: Optional[Dict[str, Any]]) -> None:
+    print(f"🔍 DEBUG: LLM Summary result: {llm_summary}")
+    if llm_summary:
+        print(f"📋 DEBUG: Complete LLM Summary Details:")
+        print(f"   - Patient Info: {llm_summary.get('patient_info', 'N/A')}")
+        print(f"   - Main Complaint: {llm_summary.get('main_complaint', 'N/A')}")
+        print(f"   - Symptom Onset: {llm_summary.get('symptom_onset', 'N/A')}")
+        print(f"   - Relevant History: {llm_summary.get('relevant_history', [])}")
+        print(f"   - Allergies: {llm_summary.get('allergies', [])}")
+        print(f"   - Red Flags: {llm_summary.get('red_flags', [])}")
+
+
+def summary_result(llm_summary: Optional[Dict[str, Any]], session_id: str) -> Dict[str, Any]:
+    """API/storage shape of a summary; LLM summary as the primary result, with fallbacks"""
+    return {
         "patient_info": llm_summary.get("patient_info", "") if llm_summary else "",
         "main_complaint": llm_summary.get("main_complaint", "") if llm_summary else "",
         "symptom_onset": llm_summary.get("symptom_onset", "") if llm_summary else "",
@@ -88,28 +105,12 @@ def generate_summary(db: Session, session_id: str):
         "created_at": datetime.utcnow().isoformat(),
         "sessionId": session_id,
     }
-    
-    print(f"🔍 DEBUG: Final result: {result}")
-    
-    # Save or update summary in database
-    existing_summary = db.query(models.IntakeSummary).filter(models.IntakeSummary.session_id == session_id).first()
-    if existing_summary:
-        # Update existing summary
-        existing_summary.complete_transcript = "\n".join(complete_transcript)
-        existing_summary.structured_summary = result
-        existing_summary.created_at = datetime.utcnow()
-        print(f"🔍 DEBUG: Updated existing summary in database")
-    else:
-        # Create new summary
-        summary_obj = models.IntakeSummary(
-            session_id=session_id,
-            complete_transcript="\n".join(complete_transcript),
-            structured_summary=result
-        )
-        db.add(summary_obj)
-        print(f"🔍 DEBUG: Created new summary in database")
-    db.commit()
-    
+
+
+def provisional_result(summary: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+    """summary_result for a rule-based summary standing in until the LLM one is ready"""
+    result = summary_result(summary, session_id)
+    result["provisional"] = True
     return result
 
 
@@ -127,19 +128,139 @@ def get_saved_summary(db: Session, session_id: str):
     }
 
 
-def list_all_summaries(db: Session, limit: int = 50):
-    """List all saved summaries for doctor review"""
-    summaries = db.query(models.IntakeSummary).order_by(models.IntakeSummary.created_at.desc()).limit(limit).all()
-    return [
+CARD_COLUMNS = ["session_id", "patient_info", "main_complaint", "red_flags", "created_at"]
+
+
+def _card_projection(source):
+    """Card columns computed from a summary row source (the table or a RETURNING CTE).
+
+    The nested fields are pulled with JSON path expressions (->> on Postgres,
+    json_extract on SQLite), so neither the transcript nor the full summary
+    JSON leaves the database.
+    """
+    return select(
+        source.session_id,
+        func.coalesce(source.structured_summary["patient_info"].as_string(), ""),
+        func.coalesce(source.structured_summary["main_complaint"].as_string(), ""),
+        source.structured_summary["red_flags"],
+        source.created_at,
+    )
+
+
+def _dialect_insert(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise ValueError(f"Upserts are not supported for the {dialect!r} dialect")
+    return dialect_insert
+
+
+def _upsert(dialect_insert, table, key, stmt_values=None, from_select=None, keep=()):
+    """INSERT ... ON CONFLICT (key) DO UPDATE of every column but id, key and ``keep``"""
+    stmt = dialect_insert(table)
+    # stmt_values is one row (dict) or a multi-row VALUES list
+    stmt = stmt.values(stmt_values) if stmt_values is not None else stmt.from_select(*from_select)
+    updated = [c.name for c in table.__table__.columns if c.name not in ("id", key, *keep)]
+    return stmt.on_conflict_do_update(index_elements=[key], set_={c: stmt.excluded[c] for c in updated})
+
+
+def summary_upsert_statements(dialect: str, session_id: str, complete_transcript: str, structured_summary: dict, touch: bool = True):
+    """Statements that write a session's summary and refresh its dashboard card.
+
+    Both are INSERT ... ON CONFLICT (session_id) DO UPDATE, so regenerating is
+    race-free. On Postgres the card upsert reads the summary through a
+    RETURNING CTE, making the whole write a single statement; SQLite (tests
+    and local runs) has no data-modifying CTEs and runs the two in sequence.
+    The card keeps the created_at of its first write, so dashboard pages do
+    not reorder while a summary changes; ``touch=False`` (provisional
+    rewrites) keeps the summary's as well.
+    """
+    return bulk_summary_upsert_statements(dialect, [(session_id, complete_transcript, structured_summary)], touch)
+
+
+def bulk_summary_upsert_statements(dialect: str, rows: List[Tuple[str, str, dict]], touch: bool = True):
+    """summary_upsert_statements for many (session_id, transcript, summary) rows at once,
+    as multi-row upserts; session ids must be distinct"""
+    summary = models.IntakeSummary
+    card = models.IntakeSummaryCard
+    dialect_insert = _dialect_insert(dialect)
+    now = datetime.utcnow()
+    write_summary = _upsert(dialect_insert, summary, "session_id", stmt_values=[
         {
-            "session_id": s.session_id,
-            "patient_info": s.structured_summary.get("patient_info", ""),
-            "main_complaint": s.structured_summary.get("main_complaint", ""),
-            "red_flags": s.structured_summary.get("red_flags", []),
-            "created_at": s.created_at.isoformat()
+            "session_id": session_id,
+            "complete_transcript": complete_transcript,
+            "structured_summary": structured_summary,
+            "created_at": now,
         }
-        for s in summaries
-    ]
+        for session_id, complete_transcript, structured_summary in rows
+    ], keep=() if touch else ("created_at",))
+    if dialect == "postgresql":
+        written = write_summary.returning(
+            summary.session_id, summary.structured_summary, summary.created_at
+        ).cte("written_summary")
+        write_card = _upsert(dialect_insert, card, "session_id", from_select=(CARD_COLUMNS, _card_projection(written.c)), keep=("created_at",))
+        return [write_card.add_cte(written)]
+    session_ids = [row[0] for row in rows]
+    projection = _card_projection(summary).where(summary.session_id.in_(session_ids))
+    write_card = _upsert(dialect_insert, card, "session_id", from_select=(CARD_COLUMNS, projection), keep=("created_at",))
+    return [write_summary, write_card]
+
 
+def summary_cards_select():
+    """Projection of the card columns the dashboard renders, newest first"""
+    card = models.IntakeSummaryCard
+    return select(
+        card.id, card.session_id, card.patient_info, card.main_complaint, card.red_flags, card.created_at
+    ).order_by(card.created_at.desc(), card.id.desc())
+
+
+def summary_card_to_dict(row) -> dict:
+    return {
+        "session_id": row.session_id,
+        "patient_info": row.patient_info or "",
+        "main_complaint": row.main_complaint or "",
+        "red_flags": row.red_flags or [],
+        "created_at": row.created_at.isoformat()
+    }
 
 
+def summary_search_select(dialect: str, has_red_flags: Optional[bool] = None, allergy: Optional[str] = None):
+    """Dashboard projection of intake_summaries filtered inside the database.
+
+    On Postgres the filters are JSONB containment/jsonpath operators served by
+    the GIN index; other dialects (SQLite in local runs) use json_each.
+    """
+    summary = models.IntakeSummary
+    doc = summary.structured_summary
+    stmt = select(
+        summary.id,
+        summary.session_id,
+        func.coalesce(doc["patient_info"].as_string(), "").label("patient_info"),
+        func.coalesce(doc["main_complaint"].as_string(), "").label("main_complaint"),
+        doc["red_flags"].label("red_flags"),
+        summary.created_at,
+    ).order_by(summary.created_at.desc(), summary.id.desc())
+
+    if dialect == "postgresql":
+        jsonb = type_coerce(doc, JSONB)
+        if allergy:
+            stmt = stmt.where(jsonb.contains({"allergies": [allergy]}))
+        if has_red_flags is not None:
+            any_red_flag = jsonb.op("@?")(cast(literal("$.red_flags[*]"), JSONPATH))
+            stmt = stmt.where(any_red_flag if has_red_flags else ~any_red_flag)
+    else:
+        if allergy:
+            allergies = func.json_each(doc, "$.allergies").table_valued("value")
+            stmt = stmt.where(select(allergies.c.value).where(allergies.c.value == allergy).exists())
+        if has_red_flags is not None:
+            red_flag_count = func.coalesce(func.json_array_length(doc, "$.red_flags"), 0)
+            stmt = stmt.where(red_flag_count > 0 if has_red_flags else red_flag_count == 0)
+    return stmt
+
+
+def list_all_summaries(db: Session, limit: int = 50):
+    """List all saved summaries for doctor review"""
+    rows = db.execute(summary_cards_select().limit(limit)).all()
+    return [summary_card_to_dict(r) for r in rows]
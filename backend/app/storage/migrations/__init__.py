@@ -0,0 +1,110 @@
+"""Versioned schema migrations for the backend tables.
+
+Each ``vNNNN_<name>.py`` module in this package defines ``revision`` (an
+increasing integer), ``description`` and ``upgrade(conn)``. Migrations run
+once, as a separate deploy step, before any worker starts:
+
+    python -m app.storage.migrations            # upgrade to head
+    python -m app.storage.migrations --status   # show current / head
+
+Workers only read the single ``schema_version`` row at startup (see
+``check``) instead of reflecting every table with create_all.
+"""
+from datetime import datetime
+from types import ModuleType
+from typing import List, Optional
+import importlib
+import logging
+import pkgutil
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("description", String(255), nullable=False, default=""),
+    Column("applied_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+# Arbitrary key for pg_advisory_xact_lock so two deploy steps never migrate at once
+_LOCK_KEY = 7_400_221
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def load_migrations() -> List[ModuleType]:
+    modules = [
+        importlib.import_module(f"{__name__}.{info.name}")
+        for info in pkgutil.iter_modules(__path__)
+        if info.name.startswith("v")
+    ]
+    modules.sort(key=lambda m: m.revision)
+    revisions = [m.revision for m in modules]
+    if len(set(revisions)) != len(revisions):
+        raise SchemaVersionError(f"Duplicate migration revisions: {revisions}")
+    return modules
+
+
+def head() -> int:
+    migrations = load_migrations()
+    return migrations[-1].revision if migrations else 0
+
+
+def current(conn: Connection) -> Optional[int]:
+    """Applied revision, or None if the database has never been migrated"""
+    if not conn.dialect.has_table(conn, schema_version.name):
+        return None
+    return conn.execute(select(schema_version.c.version).where(schema_version.c.id == 1)).scalar()
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> int:
+    """Apply pending migrations up to ``target`` (default head); returns the new revision"""
+    migrations = load_migrations()
+    if target is None:
+        target = migrations[-1].revision if migrations else 0
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+        metadata.create_all(conn, checkfirst=True)
+        applied = current(conn) or 0
+        for migration in migrations:
+            if applied < migration.revision <= target:
+                logger.info("Applying migration %s: %s", migration.revision, migration.description)
+                print(f"🗄️  Applying migration {migration.revision}: {migration.description}")
+                # Savepoint per revision so a failure leaves the last good version recorded
+                with conn.begin_nested():
+                    migration.upgrade(conn)
+                    _record(conn, migration)
+                applied = migration.revision
+    return applied
+
+
+def _record(conn: Connection, migration: ModuleType) -> None:
+    values = {"version": migration.revision, "description": migration.description, "applied_at": datetime.utcnow()}
+    updated = conn.execute(schema_version.update().where(schema_version.c.id == 1).values(**values))
+    if updated.rowcount == 0:
+        conn.execute(schema_version.insert().values(id=1, **values))
+
+
+def check(engine: Engine) -> int:
+    """Startup guard: one read of schema_version, no reflection"""
+    expected = head()
+    with engine.connect() as conn:
+        applied = current(conn)
+    if applied is None or applied < expected:
+        raise SchemaVersionError(
+            f"Database schema is at revision {applied}, code expects {expected}; "
+            f"run `python -m app.storage.migrations` first"
+        )
+    if applied > expected:
+        logger.warning("Database schema revision %s is newer than this build (%s)", applied, expected)
+    return applied
@@ -0,0 +1,24 @@
+import argparse
+import logging
+
+from .. import db
+from . import current, head, upgrade
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.storage.migrations", description="Apply schema migrations")
+    parser.add_argument("--target", type=int, default=None, help="revision to upgrade to (default: head)")
+    parser.add_argument("--status", action="store_true", help="print current and head revisions and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.status:
+        with db.engine.connect() as conn:
+            print(f"current: {current(conn)}  head: {head()}")
+        return
+    revision = upgrade(db.engine, target=args.target)
+    print(f"✅ Schema at revision {revision}")
+
+
+if __name__ == "__main__":
+    main()
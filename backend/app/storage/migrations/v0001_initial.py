@@ -0,0 +1,49 @@
+"""Baseline tables, as previously created by create_all at worker startup.
+
+Table definitions are frozen here rather than imported from models, so this
+revision keeps producing the same schema as the models evolve. checkfirst
+lets databases created before migrations existed adopt the baseline.
+"""
+from datetime import datetime
+
+from sqlalchemy import JSON, Boolean, Column, DateTime, Integer, MetaData, String, Table, Text
+from sqlalchemy.engine import Connection
+
+revision = 1
+description = "intake sessions, steps and summaries"
+
+metadata = MetaData()
+
+Table(
+    "intake_sessions",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("session_id", String(64), nullable=False, unique=True, index=True),
+    Column("created_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+Table(
+    "intake_steps",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("session_id", String(64), nullable=False, index=True),
+    Column("step", String(32), nullable=False),
+    Column("language", String(16), nullable=False),
+    Column("text", Text, nullable=False),
+    Column("confirmed", Boolean, nullable=False),
+    Column("created_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+Table(
+    "intake_summaries",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("session_id", String(64), nullable=False, unique=True, index=True),
+    Column("complete_transcript", Text, nullable=False),
+    Column("structured_summary", JSON, nullable=False),
+    Column("created_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn, checkfirst=True)
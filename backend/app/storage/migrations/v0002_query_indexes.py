@@ -0,0 +1,20 @@
+"""Composite indexes for get_intake and the keyset-paged summary listing.
+
+(session_id, created_at) replaces the session_id-only index on intake_steps;
+(created_at, id) lets the dashboard walk intake_summaries newest-first.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+revision = 2
+description = "composite step and summary listing indexes"
+
+
+def upgrade(conn: Connection) -> None:
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_intake_steps_session_id_created_at ON intake_steps (session_id, created_at)"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_intake_steps_session_id"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_intake_summaries_created_at_id ON intake_summaries (created_at, id)"
+    ))
@@ -0,0 +1,48 @@
+"""Denormalized dashboard cards, backfilled from existing summaries."""
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, MetaData, String, Table, Text, func, select
+from sqlalchemy.engine import Connection
+
+revision = 3
+description = "intake_summary_cards table and backfill"
+
+metadata = MetaData()
+
+summaries = Table(
+    "intake_summaries",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("session_id", String(64)),
+    Column("structured_summary", JSON),
+    Column("created_at", DateTime),
+)
+
+cards = Table(
+    "intake_summary_cards",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("session_id", String(64), nullable=False, unique=True, index=True),
+    Column("patient_info", Text, nullable=False, default=""),
+    Column("main_complaint", Text, nullable=False, default=""),
+    Column("red_flags", JSON, nullable=True),
+    Column("created_at", DateTime, nullable=False, default=datetime.utcnow),
+    Index("ix_intake_summary_cards_created_at_id", "created_at", "id"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    cards.create(conn, checkfirst=True)
+    if conn.execute(select(cards.c.id).limit(1)).first() is not None:
+        return
+    doc = summaries.c.structured_summary
+    conn.execute(cards.insert().from_select(
+        ["session_id", "patient_info", "main_complaint", "red_flags", "created_at"],
+        select(
+            summaries.c.session_id,
+            func.coalesce(doc["patient_info"].as_string(), ""),
+            func.coalesce(doc["main_complaint"].as_string(), ""),
+            doc["red_flags"],
+            summaries.c.created_at,
+        ),
+    ))
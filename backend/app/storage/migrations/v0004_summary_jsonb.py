@@ -0,0 +1,23 @@
+"""structured_summary as JSONB with a GIN index for the summary search (Postgres only)."""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+revision = 4
+description = "JSONB structured_summary with GIN index"
+
+
+def upgrade(conn: Connection) -> None:
+    if conn.dialect.name != "postgresql":
+        return
+    data_type = conn.execute(text(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE table_name = 'intake_summaries' AND column_name = 'structured_summary'"
+    )).scalar()
+    if data_type == "json":
+        conn.execute(text(
+            "ALTER TABLE intake_summaries ALTER COLUMN structured_summary TYPE jsonb USING structured_summary::jsonb"
+        ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_intake_summaries_structured_summary_gin "
+        "ON intake_summaries USING gin (structured_summary jsonb_path_ops)"
+    ))
@@ -0,0 +1,73 @@
+"""Monthly range partitioning of intake_steps (Postgres) and the archive index.
+
+The existing table is swapped for a partitioned one with the same columns;
+its primary key becomes (id, created_at) because Postgres requires the
+partition key in every unique constraint. Partitions are created for every
+month that already has rows plus the next few, and a default partition
+catches anything outside them. Other dialects only get the archive table.
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, Text, text
+from sqlalchemy.engine import Connection
+
+from .. import partitions
+
+revision = 5
+description = "partition intake_steps by month; intake_step_archives"
+
+metadata = MetaData()
+
+Table(
+    "intake_step_archives",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("session_id", String(64), nullable=False, index=True),
+    Column("month", String(7), nullable=False),
+    Column("archive_path", Text, nullable=False),
+    Column("step_count", Integer, nullable=False),
+    Column("archived_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn, checkfirst=True)
+    if conn.dialect.name != "postgresql":
+        return
+    already = conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'intake_steps'"
+    )).first()
+    if already:
+        return
+
+    conn.execute(text("ALTER TABLE intake_steps RENAME TO intake_steps_unpartitioned"))
+    conn.execute(text("ALTER TABLE intake_steps_unpartitioned RENAME CONSTRAINT intake_steps_pkey TO intake_steps_unpartitioned_pkey"))
+    conn.execute(text("ALTER INDEX IF EXISTS ix_intake_steps_session_id_created_at RENAME TO ix_intake_steps_unpartitioned_session_created"))
+    # Keep the id sequence alive when the old table is dropped
+    conn.execute(text("ALTER SEQUENCE intake_steps_id_seq OWNED BY NONE"))
+    conn.execute(text("""
+        CREATE TABLE intake_steps (
+            id INTEGER NOT NULL DEFAULT nextval('intake_steps_id_seq'),
+            session_id VARCHAR(64) NOT NULL,
+            step VARCHAR(32) NOT NULL,
+            language VARCHAR(16) NOT NULL,
+            text TEXT NOT NULL,
+            confirmed BOOLEAN NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT intake_steps_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """))
+    conn.execute(text("CREATE INDEX ix_intake_steps_session_id_created_at ON intake_steps (session_id, created_at)"))
+    conn.execute(text("CREATE TABLE intake_steps_default PARTITION OF intake_steps DEFAULT"))
+
+    oldest = conn.execute(text("SELECT min(created_at) FROM intake_steps_unpartitioned")).scalar()
+    now = datetime.utcnow()
+    start = (oldest.year, oldest.month) if oldest else (now.year, now.month)
+    partitions.ensure_partitions(conn, start=start)
+
+    conn.execute(text(
+        "INSERT INTO intake_steps (id, session_id, step, language, text, confirmed, created_at) "
+        "SELECT id, session_id, step, language, text, confirmed, created_at FROM intake_steps_unpartitioned"
+    ))
+    conn.execute(text("DROP TABLE intake_steps_unpartitioned"))
+    conn.execute(text("ALTER SEQUENCE intake_steps_id_seq OWNED BY intake_steps.id"))
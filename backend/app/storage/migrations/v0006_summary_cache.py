@@ -0,0 +1,24 @@
+"""Persistent tier of the LLM summary cache."""
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Float, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+revision = 6
+description = "summary_cache table for LLM summaries"
+
+metadata = MetaData()
+
+summary_cache = Table(
+    "summary_cache",
+    metadata,
+    Column("cache_key", String(64), primary_key=True),
+    Column("model", String(128), nullable=False),
+    Column("summary", JSON, nullable=False),
+    Column("llm_ms", Float, nullable=False),
+    Column("created_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    summary_cache.create(conn, checkfirst=True)
@@ -1,8 +1,9 @@
 from sqlalchemy.orm import declarative_base, Mapped, mapped_column
-from sqlalchemy import String, DateTime, JSON, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, DateTime, Float, JSON, Text, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 import uuid
 from datetime import datetime
+from typing import Optional
 
 Base = declarative_base()
 
@@ -15,9 +16,13 @@ class IntakeSession(Base):
 
 
 class IntakeStep(Base):
+    """One intake answer. On Postgres the table is range-partitioned by month on
+    created_at (primary key (id, created_at)); see storage.partitions."""
     __tablename__ = "intake_steps"
+    # Serves get_intake's filter + sort from one index; also covers session_id-only lookups
+    __table_args__ = (Index("ix_intake_steps_session_id_created_at", "session_id", "created_at"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    session_id: Mapped[str] = mapped_column(String(64), index=True)
+    session_id: Mapped[str] = mapped_column(String(64))
     step: Mapped[str] = mapped_column(String(32))
     language: Mapped[str] = mapped_column(String(16))
     text: Mapped[str] = mapped_column(Text)
@@ -27,11 +32,52 @@ class IntakeStep(Base):
 
 class IntakeSummary(Base):
     __tablename__ = "intake_summaries"
+    __table_args__ = (
+        # Dashboard listing walks this index newest-first; id breaks created_at ties for keyset paging
+        Index("ix_intake_summaries_created_at_id", "created_at", "id"),
+        # Containment / jsonpath filters (@>, @?) for the summary search; Postgres only
+        Index(
+            "ix_intake_summaries_structured_summary_gin",
+            "structured_summary",
+            postgresql_using="gin",
+            postgresql_ops={"structured_summary": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     session_id: Mapped[str] = mapped_column(String(64), unique=True, index=True)
     complete_transcript: Mapped[str] = mapped_column(Text)  # Full conversation transcript
-    structured_summary: Mapped[dict] = mapped_column(JSON)  # Structured summary JSON
+    structured_summary: Mapped[dict] = mapped_column(JSON().with_variant(JSONB(), "postgresql"))  # Structured summary JSON
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class IntakeSummaryCard(Base):
+    """Denormalized dashboard row per summary, refreshed whenever the summary is written"""
+    __tablename__ = "intake_summary_cards"
+    __table_args__ = (Index("ix_intake_summary_cards_created_at_id", "created_at", "id"),)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    session_id: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    patient_info: Mapped[str] = mapped_column(Text, default="")
+    main_complaint: Mapped[str] = mapped_column(Text, default="")
+    red_flags: Mapped[Optional[list]] = mapped_column(JSON)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
+class IntakeStepArchive(Base):
+    """Where a session's steps went when their monthly partition was archived"""
+    __tablename__ = "intake_step_archives"
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    session_id: Mapped[str] = mapped_column(String(64), index=True)
+    month: Mapped[str] = mapped_column(String(7))  # YYYY-MM
+    archive_path: Mapped[str] = mapped_column(Text)
+    step_count: Mapped[int]
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+
+class SummaryCacheEntry(Base):
+    """Persistent tier of the LLM summary cache; see summary.cache"""
+    __tablename__ = "summary_cache"
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 of model, prompt version, steps
+    model: Mapped[str] = mapped_column(String(128))
+    summary: Mapped[dict] = mapped_column(JSON)
+    llm_ms: Mapped[float] = mapped_column(Float)  # model time the entry saves on each hit
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
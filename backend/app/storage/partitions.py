@@ -0,0 +1,256 @@
+"""Monthly partitions of intake_steps (Postgres) and archival of expired months:
+
+    python -m app.storage.partitions                 # once
+    python -m app.storage.partitions --every 86400   # daily, until stopped
+
+    INTAKE_STEPS_RETENTION_MONTHS   months kept in the database (default 12)
+    INTAKE_ARCHIVE_DIR              where archives are written (default ./archive/intake_steps)
+    INTAKE_ARCHIVE_COMPRESSION      "gzip" (default) or "zstd" (needs the zstandard package)
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import argparse
+import gzip
+import io
+import json
+import os
+import time
+
+from sqlalchemy import column, func, insert, select, table as table_clause, text
+from sqlalchemy.engine import Connection, Engine
+
+from . import models
+
+RETENTION_MONTHS = int(os.getenv("INTAKE_STEPS_RETENTION_MONTHS", "12"))
+ARCHIVE_DIR = os.getenv("INTAKE_ARCHIVE_DIR", os.path.join(".", "archive", "intake_steps"))
+COMPRESSION = os.getenv("INTAKE_ARCHIVE_COMPRESSION", "gzip")
+
+STEP_COLUMNS = ["id", "session_id", "step", "language", "text", "confirmed", "created_at"]
+
+Month = Tuple[int, int]
+
+
+def add_months(month: Month, delta: int) -> Month:
+    index = month[0] * 12 + (month[1] - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+def month_start(month: Month) -> datetime:
+    return datetime(month[0], month[1], 1)
+
+
+def partition_name(month: Month) -> str:
+    return f"intake_steps_p{month[0]:04d}_{month[1]:02d}"
+
+
+def ensure_partitions(conn: Connection, start: Optional[Month] = None, months_ahead: int = 3) -> List[str]:
+    """Create monthly partitions from ``start`` (default this month) through ``months_ahead``"""
+    if conn.dialect.name != "postgresql":
+        return []
+    now = datetime.utcnow()
+    month = start or (now.year, now.month)
+    last = add_months((now.year, now.month), months_ahead)
+    existing = _existing_partitions(conn)
+    created = []
+    while month <= last:
+        if month not in existing:
+            create_partition(conn, month)
+        created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def create_partition(conn: Connection, month: Month) -> None:
+    """Create one month's partition, moving rows for it out of the default partition first.
+
+    Postgres refuses to create a partition while the default partition holds
+    rows in its range (maintenance did not run for a while), so in that case
+    the default is detached, the partition created and filled from it, and
+    the default attached again, all in the caller's transaction.
+    """
+    name = partition_name(month)
+    start, end = month_start(month).isoformat(), month_start(add_months(month, 1)).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    in_month = f"created_at >= '{start}' AND created_at < '{end}'"
+    stragglers = conn.execute(text(f"SELECT 1 FROM intake_steps_default WHERE {in_month} LIMIT 1")).first()
+    if stragglers is None:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF intake_steps {bounds}"))
+        return
+    columns = ", ".join(STEP_COLUMNS)
+    conn.execute(text("ALTER TABLE intake_steps DETACH PARTITION intake_steps_default"))
+    conn.execute(text(f"CREATE TABLE {name} PARTITION OF intake_steps {bounds}"))
+    moved = conn.execute(text(
+        f"WITH moved AS (DELETE FROM intake_steps_default WHERE {in_month} RETURNING {columns}) "
+        f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+    )).rowcount
+    conn.execute(text("ALTER TABLE intake_steps ATTACH PARTITION intake_steps_default DEFAULT"))
+    print(f"🗄️  Moved {moved} steps from intake_steps_default into {name}")
+
+
+def _existing_partitions(conn: Connection) -> Dict[Month, str]:
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'intake_steps'"
+    )).scalars()
+    partitions = {}
+    for name in rows:
+        suffix = name[len("intake_steps_p"):]
+        if name.startswith("intake_steps_p") and len(suffix) == 7:
+            partitions[(int(suffix[:4]), int(suffix[5:]))] = name
+    return partitions
+
+
+def expired_months(conn: Connection, cutoff: Month) -> List[Month]:
+    """Months strictly older than ``cutoff`` that still hold rows or partitions"""
+    months = set()
+    source = table_clause("intake_steps", column("created_at"))
+    if conn.dialect.name == "postgresql":
+        months.update(m for m in _existing_partitions(conn) if m < cutoff)
+        # Only the default partition can hold rows outside the monthly partitions
+        source = table_clause("intake_steps_default", column("created_at"))
+    oldest = conn.execute(select(func.min(source.c.created_at))).scalar()
+    if isinstance(oldest, str):
+        oldest = datetime.fromisoformat(oldest)
+    if oldest is not None:
+        month = (oldest.year, oldest.month)
+        while month < cutoff:
+            months.add(month)
+            month = add_months(month, 1)
+    return sorted(months)
+
+
+def _open_archive(path: str, mode: str, zstd: bool):
+    if zstd:
+        import zstandard
+        if "w" in mode:
+            return io.TextIOWrapper(zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb")), encoding="utf-8")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), encoding="utf-8")
+    return gzip.open(path, mode + "t", encoding="utf-8")
+
+
+def archive_month(conn: Connection, month: Month, archive_dir: str = ARCHIVE_DIR) -> int:
+    """Export one month of steps to a compressed file, index it, then drop the rows.
+
+    Rows are written sorted by (session_id, created_at) so readers can stop
+    after the requested session. Call inside a transaction: the archive file
+    is complete before the partition is dropped, and a failed commit leaves
+    the rows in place for the next run to re-archive.
+    """
+    table = models.IntakeStep.__table__
+    start, end = month_start(month), month_start(add_months(month, 1))
+    in_month = (table.c.created_at >= start) & (table.c.created_at < end)
+    rows = conn.execute(
+        select(*[table.c[c] for c in STEP_COLUMNS]).where(in_month).order_by(table.c.session_id, table.c.created_at, table.c.id)
+    ).mappings()
+
+    extension = ".jsonl.zst" if COMPRESSION == "zstd" else ".jsonl.gz"
+    # Timestamped so a later run for the same month (default-partition stragglers) never overwrites
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    path = os.path.join(archive_dir, f"{partition_name(month)}-{stamp}{extension}")
+    tmp_path = path + ".tmp"
+    counts: Dict[str, int] = {}
+    out = None
+    try:
+        for row in rows:
+            if out is None:
+                os.makedirs(archive_dir, exist_ok=True)
+                out = _open_archive(tmp_path, "w", zstd=COMPRESSION == "zstd")
+            record = dict(row)
+            if isinstance(record["created_at"], datetime):
+                record["created_at"] = record["created_at"].isoformat()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            counts[record["session_id"]] = counts.get(record["session_id"], 0) + 1
+    finally:
+        if out is not None:
+            out.close()
+    if out is not None:
+        os.replace(tmp_path, path)
+
+    label = f"{month[0]:04d}-{month[1]:02d}"
+    if counts:
+        conn.execute(insert(models.IntakeStepArchive), [
+            {"session_id": sid, "month": label, "archive_path": path, "step_count": n, "archived_at": datetime.utcnow()}
+            for sid, n in counts.items()
+        ])
+    if conn.dialect.name == "postgresql":
+        name = _existing_partitions(conn).get(month)
+        if name:
+            conn.execute(text(f"ALTER TABLE intake_steps DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+    # Non-Postgres dialects, and rows that landed in the default partition
+    conn.execute(table.delete().where(in_month))
+    return sum(counts.values())
+
+
+def archive_expired(engine: Engine, retention_months: int = RETENTION_MONTHS, archive_dir: str = ARCHIVE_DIR) -> Dict[str, int]:
+    """Archive every month older than the retention window, one transaction per month"""
+    now = datetime.utcnow()
+    cutoff = add_months((now.year, now.month), -retention_months)
+    with engine.connect() as conn:
+        months = expired_months(conn, cutoff)
+    archived = {}
+    for month in months:
+        with engine.begin() as conn:
+            archived[f"{month[0]:04d}-{month[1]:02d}"] = archive_month(conn, month, archive_dir)
+    return archived
+
+
+def read_archived_steps(paths: List[str], session_id: str) -> List[Dict[str, Any]]:
+    """Steps for one session from archive files, oldest first"""
+    steps: List[Dict[str, Any]] = []
+    for path in paths:
+        steps.extend(_scan_archive(path, session_id))
+    steps.sort(key=lambda s: (s["created_at"], s["id"]))
+    return steps
+
+
+def _scan_archive(path: str, session_id: str) -> Iterator[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return
+    with _open_archive(path, "r", zstd=path.endswith(".zst")) as f:
+        found = False
+        for line in f:
+            record = json.loads(line)
+            if record["session_id"] == session_id:
+                found = True
+                yield record
+            elif found or record["session_id"] > session_id:
+                # Rows are sorted by session_id; nothing further can match
+                return
+
+
+def run_maintenance(engine: Engine, args: argparse.Namespace) -> None:
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, months_ahead=args.months_ahead)
+    if created:
+        print(f"🗄️  Partitions present through {created[-1]}")
+    archived = archive_expired(engine, retention_months=args.retention_months, archive_dir=args.archive_dir)
+    for month, count in archived.items():
+        print(f"📦 Archived {month}: {count} steps")
+
+
+def main() -> None:
+    from . import db
+
+    parser = argparse.ArgumentParser(prog="python -m app.storage.partitions", description="Partition maintenance for intake_steps")
+    parser.add_argument("--months-ahead", type=int, default=3)
+    parser.add_argument("--retention-months", type=int, default=RETENTION_MONTHS)
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--every", type=float, default=0, help="repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    if not args.every:
+        run_maintenance(db.engine, args)
+        return
+    while True:
+        try:
+            run_maintenance(db.engine, args)
+        except Exception as e:
+            # A failed run is retried on the next round; the rows stay in the default partition meanwhile
+            print(f"⚠️ Partition maintenance failed: {e}")
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Connection pool configuration and metrics for the storage engines.
+
+    DB_POOL_SIZE            persistent connections per engine (default 10)
+    DB_MAX_OVERFLOW         extra connections allowed under burst (default 20)
+    DB_POOL_TIMEOUT         seconds to wait for a free connection (default 30)
+    DB_POOL_RECYCLE         recycle connections older than this many seconds (default 1800, -1 disables)
+    DB_POOL_PRE_PING        "always" | "idle" | "never" (default "idle")
+    DB_POOL_PRE_PING_IDLE   with "idle", only ping connections unused for this many seconds (default 60)
+"""
+from typing import Any, Dict
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    """Checkout wait-time counters shared by the timed pool classes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.timeouts = 0
+        self.pings = 0
+        self.ping_failures = 0
+
+    def record_wait(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_checkout_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait_ms, 3),
+                "checkout_timeouts": self.timeouts,
+                "pre_pings": self.pings,
+                "pre_ping_failures": self.ping_failures,
+            }
+
+
+class _TimedPoolMixin:
+    """Times how long callers wait in ``_do_get`` for a connection"""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_wait(0.0, timed_out=True)
+            raise
+        self.stats.record_wait((time.perf_counter() - start) * 1000)
+        return conn
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def pool_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """Keyword arguments for create_engine/create_async_engine from the environment"""
+    strategy = os.getenv("DB_POOL_PRE_PING", "idle").lower()
+    if url.startswith("sqlite") and (":memory:" in url or url.split("://", 1)[1] in ("", "/")):
+        # In-memory SQLite uses a singleton pool that takes no sizing options
+        return {"pool_pre_ping": strategy == "always"}
+    return {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": strategy == "always",
+    }
+
+
+def instrument(engine: Engine) -> Engine:
+    """Attach stats and the idle pre-ping strategy to a (sync view of an) engine"""
+    pool = engine.pool
+    if not hasattr(pool, "stats"):
+        pool.stats = PoolStats()
+    if os.getenv("DB_POOL_PRE_PING", "idle").lower() != "idle":
+        return engine
+    idle_s = _env_int("DB_POOL_PRE_PING_IDLE", 60)
+
+    @event.listens_for(engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_s:
+            return
+        engine.pool.stats.pings += 1
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception:
+            engine.pool.stats.ping_failures += 1
+            # Tells the pool to discard this connection and retry with a fresh one
+            raise exc.DisconnectionError()
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """Current occupancy and wait-time metrics for an engine's pool"""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,119 @@
+"""Admission control in front of the LLM backend: a bounded wait for one of
+LLM_CONCURRENCY slots, and identical in-flight requests share one call.
+Kept per event loop, since the sync crud path runs its own loops.
+
+    LLM_CONCURRENCY         concurrent LLM calls per process (default 2)
+    LLM_MAX_WAITING         callers allowed to wait for a slot (default 32)
+    LLM_ADMISSION_TIMEOUT   seconds a caller waits for a slot (default 10)
+"""
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict
+import asyncio
+import copy
+import os
+import time
+import weakref
+
+from .stats import mean, p95
+
+LIMIT = int(os.getenv("LLM_CONCURRENCY", "2"))
+MAX_WAITING = int(os.getenv("LLM_MAX_WAITING", "32"))
+ADMISSION_TIMEOUT = float(os.getenv("LLM_ADMISSION_TIMEOUT", "10"))
+
+
+class AdmissionRejected(RuntimeError):
+    pass
+
+
+class _LoopState:
+    __slots__ = ("semaphore", "inflight")
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.inflight: Dict[str, asyncio.Future] = {}
+
+
+class LLMAdmission:
+    def __init__(self, limit: int = LIMIT, max_waiting: int = MAX_WAITING, timeout: float = ADMISSION_TIMEOUT):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._waits_ms: Deque[float] = deque(maxlen=1000)
+        self.waiting = 0
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.coalesced = 0
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopState(self.limit)
+        return state
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one LLM slot for the duration of the block; raises AdmissionRejected"""
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise AdmissionRejected(f"{self.waiting} LLM requests already waiting")
+        semaphore = self._state().semaphore
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise AdmissionRejected(f"No LLM slot free within {self.timeout:.0f}s")
+        finally:
+            self.waiting -= 1
+            self._waits_ms.append((time.perf_counter() - start) * 1000)
+        self.admitted += 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            semaphore.release()
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run ``call`` in a slot, or join the identical call already in flight under ``key``"""
+        calls = self._state().inflight
+        inflight = calls.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            # Each caller gets its own copy of the shared result
+            return copy.deepcopy(await asyncio.shield(inflight))
+
+        async def admitted_call() -> Dict[str, Any]:
+            async with self.slot():
+                return await call()
+
+        task = asyncio.ensure_future(admitted_call())
+        calls[key] = task
+        task.add_done_callback(lambda _: calls.pop(key, None))
+        # A caller giving up (timeout, disconnect) must not cancel the call others are sharing
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits_ms)
+        return {
+            "limit": self.limit,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "coalesced": self.coalesced,
+            "wait_ms": {
+                "mean": mean(waits, 0.0),
+                "p95": p95(waits, 0.0),
+                "max": round(waits[-1], 1) if waits else 0.0,
+            },
+        }
+
+
+llm_admission = LLMAdmission()
@@ -1,5 +1,6 @@
-from typing import Any, Dict, List
-import os
+from typing import Any, Dict, List, Optional
+
+from .registry import summary_adapters
 
 
 class SummaryAdapter:
@@ -7,20 +8,13 @@ class SummaryAdapter:
         raise NotImplementedError
 
 
-def get_summary_adapter() -> SummaryAdapter:
-    provider = os.getenv("LLM_PROVIDER", "rag")
-    if provider == "ollama":
-        from .ollama_adapter import OllamaSummaryAdapter
-        base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-        model = os.getenv("OLLAMA_MODEL", "llama3.2")
-        return OllamaSummaryAdapter(base_url=base_url, model=model)
-    elif provider == "rag":
-        from .rag_adapter import RAGSummaryAdapter
-        base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-        model = os.getenv("OLLAMA_MODEL", "llama3.2")
-        return RAGSummaryAdapter(base_url=base_url, model=model)
-    else:
-        from .rule_based import RuleBasedSummaryAdapter
-        return RuleBasedSummaryAdapter()
+class FallbackSummary(dict):
+    """A summary an LLM adapter extracted by rules because the model gave none.
+
+    Saved and shown like any other summary, but never counted as model output.
+    """
 
 
+def get_summary_adapter(provider: Optional[str] = None) -> SummaryAdapter:
+    """The shared adapter instance for ``provider``, or for LLM_PROVIDER; see app.summary.registry"""
+    return summary_adapters.get(provider)
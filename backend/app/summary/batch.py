@@ -0,0 +1,253 @@
+"""Batch (re-)summarization for backlogs, in checkpointed chunks:
+
+    python -m app.summary.batch                   # sessions without a (non-provisional) summary
+    python -m app.summary.batch --all --resume    # every session, from the checkpoint
+
+    SUMMARY_BATCH_CHUNK         sessions per chunk (default 200)
+    SUMMARY_BATCH_PARALLEL      concurrent summaries (default LLM_CONCURRENCY)
+    SUMMARY_BATCH_CHECKPOINT    checkpoint file (default ./summary_batch_checkpoint.json)
+"""
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from sqlalchemy import exists, func, select
+
+from ..storage import async_crud, db, models
+from ..storage.crud import (
+    SUMMARY_TIMEOUT, bulk_summary_upsert_statements, summary_result, summary_steps_payload, summary_transcript,
+)
+from . import admission
+from .base import FallbackSummary, get_summary_adapter
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = int(os.getenv("SUMMARY_BATCH_CHUNK", "200"))
+PARALLEL = int(os.getenv("SUMMARY_BATCH_PARALLEL", str(admission.LIMIT)))
+CHECKPOINT = os.getenv("SUMMARY_BATCH_CHECKPOINT", "summary_batch_checkpoint.json")
+
+MODES = ("missing", "all")
+
+
+@dataclass
+class BatchProgress:
+    mode: str = "missing"
+    last_id: int = 0  # IntakeSession.id of the last committed session
+    processed: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    done: bool = False
+
+    @property
+    def sessions_per_sec(self) -> float:
+        return self.processed / self.elapsed_s if self.elapsed_s else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "sessions_per_sec": round(self.sessions_per_sec, 2)}
+
+
+def load_checkpoint(path: str, mode: str) -> BatchProgress:
+    if not os.path.exists(path):
+        return BatchProgress(mode=mode)
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("mode") != mode:
+        raise ValueError(f"Checkpoint {path} is for mode {data.get('mode')!r}, not {mode!r}")
+    return BatchProgress(**{k: data[k] for k in ("mode", "last_id", "processed", "failed", "elapsed_s", "done") if k in data})
+
+
+def save_checkpoint(path: str, progress: BatchProgress) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(asdict(progress), f)
+    os.replace(tmp_path, path)
+
+
+async def session_chunks(mode: str, after_id: int, chunk_size: int) -> AsyncIterator[List[Tuple[int, str]]]:
+    """(id, session_id) chunks in id order; keyset on id, so each chunk is one index range scan"""
+    session_table = models.IntakeSession
+    while True:
+        stmt = (
+            select(session_table.id, session_table.session_id)
+            .where(session_table.id > after_id)
+            .order_by(session_table.id)
+            .limit(chunk_size)
+        )
+        if mode == "missing":
+            # A provisional summary (kept up as steps arrive) still lacks the LLM pass
+            summary = models.IntakeSummary
+            provisional = func.coalesce(summary.structured_summary["provisional"].as_boolean(), False)
+            stmt = stmt.where(~exists().where(summary.session_id == session_table.session_id, ~provisional))
+        async with db.AsyncSessionLocal() as session:
+            rows = (await session.execute(stmt)).all()
+        if not rows:
+            return
+        yield [(r.id, r.session_id) for r in rows]
+        after_id = rows[-1].id
+
+
+async def load_steps(session_ids: List[str]) -> Dict[str, list]:
+    """Steps for a whole chunk, archived ones included, grouped by session"""
+    async with db.AsyncSessionLocal() as session:
+        return await async_crud.load_steps(session, session_ids)
+
+
+async def summarize_chunk(adapter, steps_by_session: Dict[str, list], parallel: int) -> Tuple[List[Tuple[str, str, dict]], int]:
+    """Summaries for one chunk as upsert rows, plus the number of sessions that failed"""
+    if hasattr(adapter, "summarize_batch"):
+        # Adapters without an LLM round trip summarize the whole chunk in one call
+        session_ids = list(steps_by_session)
+        payloads = [summary_steps_payload(steps_by_session[sid]) for sid in session_ids]
+        summaries = await adapter.summarize_batch(payloads)
+        return [
+            (sid, summary_transcript(steps_by_session[sid]), summary_result(summary, sid))
+            for sid, summary in zip(session_ids, summaries)
+        ], 0
+
+    semaphore = asyncio.Semaphore(parallel)
+    rows: List[Tuple[str, str, dict]] = []
+    failed = 0
+
+    async def one(session_id: str, steps: list) -> None:
+        nonlocal failed
+        async with semaphore:
+            try:
+                llm_summary = await asyncio.wait_for(adapter.summarize(summary_steps_payload(steps)), timeout=SUMMARY_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Batch summary for session {session_id} failed: {e}")
+                failed += 1
+                return
+        if isinstance(llm_summary, FallbackSummary):
+            # Breaker open or Ollama down: leave the session for the next "missing" run
+            logger.warning(f"Batch summary for session {session_id} fell back to extraction; not saved")
+            failed += 1
+            return
+        rows.append((session_id, summary_transcript(steps), summary_result(llm_summary, session_id)))
+
+    await asyncio.gather(*(one(sid, steps) for sid, steps in steps_by_session.items()))
+    return rows, failed
+
+
+async def run_batch(
+    mode: str = "missing",
+    chunk_size: int = CHUNK_SIZE,
+    parallel: int = PARALLEL,
+    checkpoint_path: str = CHECKPOINT,
+    resume: bool = False,
+    on_progress: Optional[Callable[[BatchProgress], None]] = None,
+) -> BatchProgress:
+    if mode not in MODES:
+        raise ValueError(f"Unknown batch mode {mode!r}; expected one of {MODES}")
+    progress = load_checkpoint(checkpoint_path, mode) if resume else BatchProgress(mode=mode)
+    if progress.done:
+        return progress
+    adapter = get_summary_adapter()
+
+    async for chunk in session_chunks(mode, progress.last_id, chunk_size):
+        start = time.perf_counter()
+        steps_by_session = await load_steps([sid for _, sid in chunk])
+        rows, failed = await summarize_chunk(adapter, steps_by_session, parallel)
+        if rows:
+            async with db.AsyncSessionLocal() as session:
+                for stmt in bulk_summary_upsert_statements(session.bind.dialect.name, rows):
+                    await session.execute(stmt)
+                await session.commit()
+            for session_id, _, _ in rows:
+                db.mark_written(session_id)
+
+        progress.last_id = chunk[-1][0]
+        progress.processed += len(rows)
+        progress.failed += failed
+        progress.elapsed_s += time.perf_counter() - start
+        save_checkpoint(checkpoint_path, progress)
+        if on_progress:
+            on_progress(progress)
+
+    progress.done = True
+    save_checkpoint(checkpoint_path, progress)
+    return progress
+
+
+class BatchRunner:
+    """At most one API-started batch per process, running as a background task"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.progress: Optional[BatchProgress] = None
+        self.error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, **kwargs) -> None:
+        if self.running:
+            raise RuntimeError("A summary batch is already running")
+        self.progress = BatchProgress(mode=kwargs.get("mode", "missing"))
+        self.error = None
+
+        def update(progress: BatchProgress) -> None:
+            self.progress = progress
+
+        async def run() -> None:
+            try:
+                self.progress = await run_batch(on_progress=update, **kwargs)
+            except Exception as e:
+                logger.error(f"Summary batch failed: {e}")
+                self.error = str(e)
+
+        self._task = asyncio.create_task(run())
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "progress": self.progress.to_dict() if self.progress else None,
+            "error": self.error,
+        }
+
+
+batch_runner = BatchRunner()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.summary.batch", description="Batch summarization of intake sessions")
+    parser.add_argument("--all", action="store_true", help="re-summarize every session, not only ones without a summary")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint file")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--parallel", type=int, default=PARALLEL)
+    parser.add_argument("--checkpoint", default=CHECKPOINT)
+    args = parser.parse_args()
+
+    def report(progress: BatchProgress) -> None:
+        print(f"📦 {progress.processed} summarized, {progress.failed} failed, "
+              f"up to session #{progress.last_id}, {progress.sessions_per_sec:.1f} sessions/sec")
+
+    async def run() -> BatchProgress:
+        from . import ollama_client
+        # The shared client lets the adapters reuse connections, as they do in the app
+        await ollama_client.start()
+        try:
+            return await run_batch(
+                mode="all" if args.all else "missing",
+                chunk_size=args.chunk_size,
+                parallel=args.parallel,
+                checkpoint_path=args.checkpoint,
+                resume=args.resume,
+                on_progress=report,
+            )
+        finally:
+            await ollama_client.close()
+            await db.async_engine.dispose()
+
+    progress = asyncio.run(run())
+    print(f"✅ Done: {progress.processed} sessions in {progress.elapsed_s:.1f}s "
+          f"({progress.sessions_per_sec:.1f} sessions/sec), {progress.failed} failed")
+
+
+if __name__ == "__main__":
+    main()
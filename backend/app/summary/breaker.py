@@ -0,0 +1,131 @@
+"""Circuit breaker for the LLM backend: after repeated failures the adapters
+fall back straight away instead of waiting out timeouts.
+
+    LLM_BREAKER_FAILURES    consecutive failures that open the breaker (default 5)
+    LLM_BREAKER_COOLDOWN    seconds the breaker stays open (default 30)
+    LLM_BREAKER_PROBES      concurrent half-open probe calls (default 1)
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+import asyncio
+import logging
+import os
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+PROBES = int(os.getenv("LLM_BREAKER_PROBES", "1"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# What counts against the backend; a malformed answer still means Ollama is up
+BACKEND_ERRORS = (httpx.HTTPError, asyncio.TimeoutError, OSError)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN, probes: int = PROBES):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probes = probes
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = 0
+        self.opened = 0
+        self.short_circuited = 0
+        self.failures = 0
+        self.successes = 0
+        self.last_change: Optional[float] = None  # wall-clock time of the last state change
+
+    def _set_state(self, state: str, reason: str) -> None:
+        if state == self.state:
+            return
+        log = logger.warning if state == OPEN else logger.info
+        log(f"LLM circuit breaker {self.state} -> {state}: {reason}")
+        self.state = state
+        self.last_change = time.time()
+        if state == OPEN:
+            self.opened += 1
+            self._opened_at = time.monotonic()
+
+    def rejecting(self) -> bool:
+        """True (and counted as short-circuited) while calls would be turned away;
+        lets callers skip straight to their fallback"""
+        if self.state == CLOSED:
+            return False
+        if self.state == OPEN:
+            rejected = time.monotonic() - self._opened_at < self.cooldown
+        else:
+            rejected = self._probing >= self.probes
+        self.short_circuited += rejected
+        return rejected
+
+    def _acquire(self) -> bool:
+        """Admit one call; True if it is a half-open probe"""
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._set_state(HALF_OPEN, f"{self.cooldown:.0f}s cool-down over, probing")
+        if self.state == CLOSED:
+            return False
+        if self.state == OPEN or self._probing >= self.probes:
+            self.short_circuited += 1
+            raise CircuitOpenError(f"LLM circuit breaker is {self.state}")
+        self._probing += 1
+        return True
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Wrap one LLM call: raises CircuitOpenError while open, and records how the call went.
+
+        Other exceptions, cancellation included, pass through without a verdict:
+        a caller giving up says nothing about the backend.
+        """
+        probe = self._acquire()
+        try:
+            yield
+        except BACKEND_ERRORS as e:
+            self._failure(e)
+            raise
+        else:
+            self._success()
+        finally:
+            if probe:
+                self._probing -= 1
+
+    def _success(self) -> None:
+        self.successes += 1
+        self.consecutive_failures = 0
+        self._set_state(CLOSED, "LLM call succeeded")
+
+    def _failure(self, error: BaseException) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self._set_state(OPEN, f"probe failed: {error!r}")
+        elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._set_state(OPEN, f"{self.consecutive_failures} consecutive failures, last: {error!r}")
+
+    def stats(self) -> Dict[str, Any]:
+        remaining = self.cooldown - (time.monotonic() - self._opened_at) if self.state == OPEN else 0.0
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "cooldown_s": self.cooldown,
+            "cooldown_remaining_s": round(max(0.0, remaining), 1),
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+            "failures": self.failures,
+            "successes": self.successes,
+            "last_change": self.last_change,
+        }
+
+
+llm_breaker = CircuitBreaker()
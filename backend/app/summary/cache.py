@@ -0,0 +1,112 @@
+"""Content-addressed cache for LLM summaries, in memory and optionally in the
+``summary_cache`` table. Bump an adapter's ``prompt_version`` when its prompt changes.
+
+    SUMMARY_CACHE_SIZE      in-memory entries (default 1024, 0 disables the memory tier)
+    SUMMARY_CACHE_DB        "1" to enable the database tier (default off)
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import time
+
+from . import ollama_client
+
+CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "1024"))
+CACHE_DB = os.getenv("SUMMARY_CACHE_DB", "0") == "1"
+
+
+def cache_key(model: str, prompt_version: str, steps: List[Dict[str, Any]]) -> str:
+    """sha256 over everything that reaches the prompt: model, template version, confirmed answers"""
+    confirmed = [[s.get("step"), s.get("text")] for s in steps if s.get("confirmed") and s.get("text")]
+    payload = json.dumps({"model": model, "prompt": prompt_version, "steps": confirmed}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    def __init__(self, max_entries: int = CACHE_SIZE, use_db: bool = CACHE_DB):
+        self.max_entries = max_entries
+        self.use_db = use_db
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    def _db_available(self) -> bool:
+        # The async engine's connections belong to the app loop, like the shared HTTP client
+        return self.use_db and ollama_client.client_loop() is asyncio.get_running_loop()
+
+    def _remember(self, key: str, summary: Dict[str, Any], llm_ms: float) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (summary, llm_ms)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+        elif self._db_available():
+            entry = await self._db_get(key)
+            if entry is not None:
+                self._remember(key, *entry)
+                self.db_hits += 1
+        if entry is None:
+            self.misses += 1
+            return None
+        summary, llm_ms = entry
+        self.saved_ms += max(0.0, llm_ms - (time.perf_counter() - start) * 1000)
+        return copy.deepcopy(summary)
+
+    async def put(self, key: str, model: str, summary: Dict[str, Any], llm_ms: float) -> None:
+        summary = copy.deepcopy(summary)
+        self._remember(key, summary, llm_ms)
+        if self._db_available():
+            await self._db_put(key, model, summary, llm_ms)
+
+    async def _db_get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        from ..storage import async_crud, db
+        try:
+            async with db.AsyncSessionLocal() as session:
+                row = await async_crud.get_cached_summary(session, key)
+                return (row.summary, row.llm_ms) if row is not None else None
+        except Exception as e:
+            print(f"⚠️ Summary cache read failed: {e}")
+            return None
+
+    async def _db_put(self, key: str, model: str, summary: Dict[str, Any], llm_ms: float) -> None:
+        from ..storage import async_crud, db
+        try:
+            async with db.AsyncSessionLocal() as session:
+                await async_crud.put_cached_summary(session, key, model, summary, llm_ms)
+        except Exception as e:
+            print(f"⚠️ Summary cache write failed: {e}")
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "db_tier": self.use_db,
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_ms": round(self.saved_ms, 1),
+        }
+
+
+summary_cache = SummaryCache()
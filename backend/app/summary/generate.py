@@ -0,0 +1,54 @@
+"""Non-streamed summary generation shared by the Ollama-backed adapters."""
+from typing import Any, Dict, Optional, Tuple
+import logging
+import time
+
+from .breaker import llm_breaker
+from .ollama_client import ollama_client
+from .prompts import Prompt, prompt_stats
+from .schema import PARSE_RETRIES, SummaryParseError, loads, parse_stats, request_format
+from .warmup import model_warmer
+
+logger = logging.getLogger(__name__)
+
+RETRY_TEMPERATURE = 0.3
+
+
+def request_body(model: str, prompt: Prompt, options: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+    body = {"model": model, "prompt": prompt.text, "stream": stream, "options": options, **model_warmer.request_fields()}
+    output_format = request_format()
+    if output_format is not None:
+        body["format"] = output_format
+    return body
+
+
+async def generate_summary(
+    base_url: str, model: str, prompt: Prompt, options: Dict[str, Any], source: str,
+) -> Optional[Tuple[Dict[str, Any], float]]:
+    """(validated summary, LLM milliseconds over all attempts), or None when no attempt produced one.
+
+    HTTP errors, and CircuitOpenError while the LLM circuit breaker is open, propagate;
+    the adapters treat them like any other LLM failure.
+    """
+    total_ms = 0.0
+    for attempt in range(PARSE_RETRIES + 1):
+        if not parse_stats.attempt(retry=attempt > 0):
+            logger.warning(f"{source}: retry budget exhausted, giving up on malformed output")
+            return None
+        if attempt:
+            options = {**options, "temperature": max(options.get("temperature", 0.0), RETRY_TEMPERATURE)}
+        start_time = time.perf_counter()
+        with llm_breaker.guard():
+            async with ollama_client() as client:
+                response = await client.post(f"{base_url}/api/generate", json=request_body(model, prompt, options, stream=False))
+                response.raise_for_status()
+                result = loads(response.content)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        total_ms += elapsed_ms
+        prompt_stats.record(source, prompt, result, elapsed_ms)
+        model_warmer.record(result, elapsed_ms)
+        try:
+            return parse_stats.parse(result.get("response", "")), total_ms
+        except SummaryParseError as e:
+            logger.warning(f"{source}: malformed summary from {model} (attempt {attempt + 1}): {e}")
+    return None
@@ -0,0 +1,61 @@
+"""Provisional rule-based summaries, updated as each confirmed step is saved.
+Saving SUMMARY_LLM_STEP queues the LLM summary that replaces it, or, when the
+default provider runs inline, makes the provisional summary final.
+
+    INCREMENTAL_SUMMARY     1 (default) keeps provisional summaries; 0 turns step updates off
+    SUMMARY_LLM_STEP        step that queues the LLM pass (default safety)
+"""
+from typing import Any, Dict, Iterable, Optional, Tuple
+import logging
+import os
+
+from .base import get_summary_adapter
+from .registry import is_inline
+from .rule_based import apply_step
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("INCREMENTAL_SUMMARY", "1") == "1"
+LLM_STEP = os.getenv("SUMMARY_LLM_STEP", "safety")
+
+
+def fold_steps(transcript: str, summary: Dict[str, Any], steps: Iterable[Tuple[str, str]]) -> str:
+    """Add confirmed (step, text) answers to ``summary`` in place; returns the extended transcript"""
+    lines = [transcript] if transcript else []
+    for step, text in steps:
+        apply_step(summary, step, text)
+        lines.append(f"[{step}] {text}")
+    return "\n".join(lines)
+
+
+def schedule_llm_pass(session_id: str):
+    """Queue the default provider's summary for a session that reached LLM_STEP.
+
+    Returns the job, or None when there is nothing to queue: the default
+    provider is the rule-based one (the provisional summary already is its
+    result), or no job queue runs in this process (scripts, benchmarks).
+    """
+    from .jobs import summary_jobs  # jobs imports the storage layer, which imports this module
+
+    if default_is_inline() or not summary_jobs.running:
+        return None
+    try:
+        return summary_jobs.submit(session_id)
+    except RuntimeError as e:
+        # The provisional summary stays; the clinician can still ask for the LLM one
+        logger.warning(f"LLM summary for session {session_id} not queued: {e}")
+        return None
+
+
+def default_is_inline() -> bool:
+    """Whether the default provider runs inline, so a provisional summary already is its result"""
+    return is_inline(get_summary_adapter())
+
+
+def reaches_llm_step(steps: Iterable[Tuple[str, bool]]) -> bool:
+    """Whether any of the (step, confirmed) pairs is a confirmed LLM_STEP answer"""
+    return any(confirmed and step == LLM_STEP for step, confirmed in steps)
+
+
+def is_provisional(summary: Optional[Dict[str, Any]]) -> bool:
+    return bool(summary and summary.get("provisional"))
@@ -0,0 +1,160 @@
+"""Background summary generation; finished summaries are pushed over the summary websocket.
+
+    SUMMARY_WORKERS         concurrent summary jobs per process (default 4)
+    SUMMARY_QUEUE_SIZE      queued jobs before POST answers 503 (default 1000)
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import uuid
+
+from ..storage import async_crud, db
+from .registry import summary_adapters
+from .ws_manager import summary_ws_manager
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("SUMMARY_WORKERS", "4"))
+QUEUE_SIZE = int(os.getenv("SUMMARY_QUEUE_SIZE", "1000"))
+# Finished jobs kept for GET /api/intake/summary-jobs/{id}
+JOB_HISTORY = 1000
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+@dataclass
+class SummaryJob:
+    session_id: str
+    provider: Optional[str] = None  # resolved name, so "default" and "rag" are the same job
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued | running | done | error
+    result: Optional[Dict[str, Any]] = None
+    draft: Optional[Dict[str, Any]] = None  # rule-based summary shown until ``result`` arrives
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    finished: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "jobId": self.job_id,
+            "sessionId": self.session_id,
+            "provider": self.provider,
+            "status": self.status,
+            "result": self.result,
+            "draft": self.draft,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class SummaryJobQueue:
+    def __init__(self, workers: int = WORKERS, max_queued: int = QUEUE_SIZE):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, SummaryJob]" = OrderedDict()
+        # (session_id, provider) -> job not yet finished, so repeated clicks share one job
+        self._pending: Dict[Tuple[str, Optional[str]], SummaryJob] = {}
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Summary job queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def submit(self, session_id: str, provider: Optional[str] = None) -> SummaryJob:
+        """Queue a summary for the session, or return the one already queued or running"""
+        if self._queue is None:
+            raise RuntimeError("Summary job queue is not running")
+        provider = summary_adapters.resolve(provider)
+        pending = self._pending.get((session_id, provider))
+        if pending is not None:
+            return pending
+        job = SummaryJob(session_id=session_id, provider=provider)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"{self._queue.qsize()} summary jobs already queued")
+        self._pending[(session_id, provider)] = job
+        self._remember(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[SummaryJob]:
+        return self._jobs.get(job_id)
+
+    def _remember(self, job: SummaryJob) -> None:
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > JOB_HISTORY:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.finished.is_set():
+                break
+            del self._jobs[oldest_id]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: SummaryJob) -> None:
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        try:
+            async with db.AsyncSessionLocal() as session:
+                job.result = await async_crud.generate_summary(session, job.session_id, job.provider)
+            job.status = "done"
+            self.completed += 1
+        except Exception as e:
+            logger.error(f"Summary job {job.job_id} for session {job.session_id} failed: {e}")
+            job.status = "error"
+            job.error = str(e)
+            self.failed += 1
+        finally:
+            job.finished_at = datetime.utcnow()
+            self._pending.pop((job.session_id, job.provider), None)
+            job.finished.set()
+
+        if job.status == "done":
+            await summary_ws_manager.send_summary_generated(job.session_id, job.job_id, job.result)
+        else:
+            await summary_ws_manager.send_summary_error(job.session_id, job.job_id, job.error or "Unknown error")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": sum(1 for j in self._pending.values() if j.status == "running"),
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+summary_jobs = SummaryJobQueue()
@@ -1,39 +1,28 @@
-from typing import Any, Dict, List
-import json
-import httpx
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
+from .admission import AdmissionRejected, llm_admission
+from .base import FallbackSummary
+from .breaker import llm_breaker
+from .cache import cache_key, summary_cache
+from .generate import generate_summary
+from .prompts import Prompt, PromptBuilder, TOKEN_BUDGET
+from .step_index import StepIndex
+from .streaming import stream_llm_fields
 
-class OllamaSummaryAdapter:
-    def __init__(self, base_url: str = "http://ollama:11434", model: str = "llama3.2"):
-        self.base_url = base_url
-        self.model = model
 
-    async def summarize(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
-        print(f"🤖 DEBUG: Ollama adapter called with {len(steps)} steps")
-        
-        # Build context from steps - only confirmed responses
-        context = []
-        for step in steps:
-            if step.get("confirmed") and step.get("text"):
-                context.append(f"{step['step']}: {step['text']}")
-        
-        print(f"🤖 DEBUG: Context built: {context}")
-        
-        # RAG-based prompt - only extract what was actually said
-        prompt = f"""You are a medical intake assistant. Extract ONLY information that was explicitly provided by the patient in this conversation. Do NOT add, assume, or hallucinate any information.
-
-Conversation:
-{chr(10).join(context)}
+# RAG-based prompt - only extract what was actually said. Static, so Ollama can
+# reuse its KV cache for it; the conversation goes after it.
+PROMPT = PromptBuilder("""You are a medical intake assistant. Extract ONLY information that was explicitly provided by the patient in the conversation below. Do NOT add, assume, or hallucinate any information.
 
 Extract and return a JSON object with these fields. Use "Not provided" for any field that wasn't explicitly mentioned:
-{{
+{
   "patient_info": "Name: [only if name was given]; DOB: [only if date of birth was given]; Contact: [only if contact was given]",
   "main_complaint": "[only the reason for visit that was stated]",
   "symptom_onset": "[only if onset time was mentioned]",
   "relevant_history": ["[only medical history that was explicitly mentioned]"],
   "allergies": ["[only allergies that were specifically stated]"],
   "red_flags": ["[only urgent symptoms that were mentioned]"]
-}}
+}
 
 CRITICAL: 
 - If a field was not mentioned, use "Not provided" or empty array []
@@ -41,63 +30,93 @@ CRITICAL:
 - Do NOT make assumptions about lifestyle, occupation, or medical history
 - Only include what the patient actually said
 
-Return only valid JSON, no other text."""
+Return only valid JSON, no other text.
+
+Conversation:
+""")
+
+
+class OllamaSummaryAdapter:
+    # bump when the prompt changes; part of the summary cache key, like the budget that decides where answers are cut
+    prompt_version = f"ollama-3/{TOKEN_BUDGET}"
+    options = {"temperature": 0.1}
+
+    def __init__(self, base_url: str = "http://ollama:11434", model: str = "llama3.2"):
+        self.base_url = base_url
+        self.model = model
+
+    def _build_prompt(self, steps: List[Dict[str, Any]]) -> Prompt:
+        # Build context from steps - only confirmed responses
+        context = [(step["step"], step["text"]) for step in steps if step.get("confirmed") and step.get("text")]
+
+        print(f"🤖 DEBUG: Context built: {context}")
+
+        return PROMPT.build(context)
 
-        print(f"🤖 DEBUG: Sending request to Ollama at {self.base_url}/api/generate")
+    async def summarize(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        print(f"🤖 DEBUG: Ollama adapter called with {len(steps)} steps")
+
+        key = cache_key(self.model, self.prompt_version, steps)
+        cached = await summary_cache.get(key)
+        if cached is not None:
+            print(f"🤖 DEBUG: Summary cache hit {key[:12]}")
+            return cached
+
+        if llm_breaker.rejecting():
+            print(f"🤖 DEBUG: LLM circuit breaker {llm_breaker.state}, using fallback extraction")
+            return self._fallback_extract(steps)
+
+        try:
+            return await llm_admission.run(key, lambda: self._generate(steps, key))
+        except AdmissionRejected as e:
+            print(f"🤖 DEBUG: LLM busy, using fallback extraction: {e}")
+            return self._fallback_extract(steps)
+
+    async def _generate(self, steps: List[Dict[str, Any]], key: str) -> Dict[str, Any]:
+        prompt = self._build_prompt(steps)
+
+        print(f"🤖 DEBUG: Sending request to Ollama at {self.base_url}/api/generate (~{prompt.tokens} prompt tokens)")
         print(f"🤖 DEBUG: Using model: {self.model}")
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {"temperature": 0.1}
-                    }
-                )
-                response.raise_for_status()
-                result = response.json()
-                response_text = result.get("response", "").strip()
-                
-                print(f"🤖 DEBUG: Ollama response: {response_text}")
-                
-                # Extract JSON from response
-                try:
-                    # Look for JSON in the response
-                    start = response_text.find("{")
-                    end = response_text.rfind("}") + 1
-                    if start >= 0 and end > start:
-                        json_str = response_text[start:end]
-                        parsed_json = json.loads(json_str)
-                        print(f"🤖 DEBUG: Parsed JSON from Ollama: {parsed_json}")
-                        return parsed_json
-                except (json.JSONDecodeError, ValueError) as e:
-                    print(f"🤖 DEBUG: JSON parsing failed: {e}")
-                
-                # Fallback to basic extraction
-                print(f"🤖 DEBUG: Using fallback extraction")
-                return self._fallback_extract(steps)
-                
+            generated = await generate_summary(self.base_url, self.model, prompt, self.options, source="ollama")
         except Exception as e:
             print(f"🤖 DEBUG: Ollama API error: {e}")
             return self._fallback_extract(steps)
 
-    def _fallback_extract(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if generated is None:
+            # Fallback to basic extraction
+            print(f"🤖 DEBUG: No valid JSON from Ollama, using fallback extraction")
+            return self._fallback_extract(steps)
+        parsed_json, llm_ms = generated
+        print(f"🤖 DEBUG: Parsed JSON from Ollama: {parsed_json}")
+        await summary_cache.put(key, self.model, parsed_json, llm_ms)
+        return parsed_json
+
+    async def summarize_stream(self, steps: List[Dict[str, Any]]) -> AsyncIterator[Tuple[str, Any]]:
+        """Like summarize, but yields (field, value) as soon as the model has finished each field"""
+        key = cache_key(self.model, self.prompt_version, steps)
+        cached = await summary_cache.get(key)
+        if cached is not None:
+            for item in cached.items():
+                yield item
+            return
+        prompt = self._build_prompt(steps)
+        async for item in stream_llm_fields(
+            self.base_url, self.model, prompt, self.options, key, lambda: self._fallback_extract(steps), source="ollama",
+        ):
+            yield item
+
+    def _fallback_extract(self, steps: List[Dict[str, Any]]) -> FallbackSummary:
         """Conservative fallback extraction - only what was explicitly provided"""
-        def find(step: str):
-            for s in steps:
-                if s.get("step") == step and s.get("confirmed"):
-                    return s.get("text", "")
-            return ""
-        
+        index = StepIndex(steps)
+
         # Only extract what was actually provided
-        patient_info = find("identification")
-        main_complaint = find("reason")
-        symptom_onset = find("onset")
-        history = find("history")
-        allergies = find("allergies")
+        patient_info = index.first("identification")
+        main_complaint = index.first("reason")
+        symptom_onset = index.first("onset")
+        history = index.first("history")
+        allergies = index.first("allergies")
         
         # Build patient_info string only if we have data
         patient_info_str = ""
@@ -106,11 +125,11 @@ Return only valid JSON, no other text."""
         else:
             patient_info_str = "Not provided"
         
-        return {
+        return FallbackSummary({
             "patient_info": patient_info_str,
             "main_complaint": main_complaint if main_complaint else "Not provided",
             "symptom_onset": symptom_onset if symptom_onset else "Not provided",
             "relevant_history": [history] if history else [],
             "allergies": [allergies] if allergies else [],
             "red_flags": [],  # Only add if explicitly mentioned
-        }
+        })
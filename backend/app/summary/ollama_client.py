@@ -0,0 +1,75 @@
+"""Process-wide pooled HTTP client for the Ollama-backed summary adapters.
+
+    OLLAMA_TIMEOUT              request timeout in seconds (default 30)
+    OLLAMA_MAX_CONNECTIONS      connection pool limit (default 20)
+    OLLAMA_MAX_KEEPALIVE        idle connections kept open (default 10)
+    OLLAMA_KEEPALIVE_EXPIRY     seconds an idle connection is kept (default 60)
+    OLLAMA_HTTP2                "1" to negotiate HTTP/2 (needs the h2 package)
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+import os
+
+import httpx
+
+TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "30"))
+MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "60"))
+HTTP2 = os.getenv("OLLAMA_HTTP2", "0") == "1"
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    try:
+        return httpx.AsyncClient(timeout=TIMEOUT, limits=limits, http2=HTTP2)
+    except ImportError:
+        print("⚠️ OLLAMA_HTTP2=1 but the h2 package is not installed; using HTTP/1.1")
+        return httpx.AsyncClient(timeout=TIMEOUT, limits=limits)
+
+
+async def start() -> httpx.AsyncClient:
+    """Open the shared client on the running loop (app startup)"""
+    global _client, _client_loop
+    if _client is None or _client.is_closed:
+        _client = build_client()
+        _client_loop = asyncio.get_running_loop()
+    return _client
+
+
+async def close() -> None:
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def client_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """The event loop the shared client lives on, if it is open"""
+    if _client is None or _client.is_closed:
+        return None
+    return _client_loop
+
+
+@asynccontextmanager
+async def ollama_client() -> AsyncIterator[httpx.AsyncClient]:
+    """The shared client, or a one-off client when called outside its event loop.
+
+    Pooled connections are bound to the loop that opened them, so callers on
+    another loop (scripts, worker threads running asyncio.run) get their own
+    short-lived client.
+    """
+    if client_loop() is asyncio.get_running_loop():
+        yield _client
+        return
+    async with build_client() as client:
+        yield client
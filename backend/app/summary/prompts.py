@@ -0,0 +1,146 @@
+"""Prompt assembly for the LLM summary adapters: a static prefix (so Ollama can
+reuse its KV cache) and the session data, compacted to PROMPT_TOKEN_BUDGET.
+
+    PROMPT_TOKEN_BUDGET     approximate tokens per prompt, prefix included (default 1536)
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+import logging
+import os
+import re
+
+from .stats import mean, p95
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1536"))
+MIN_LINE_TOKENS = 16  # every line keeps at least this much, however small the budget
+TRUNCATION_MARK = " …"
+
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+def approx_tokens(text: str) -> int:
+    return len(_TOKEN_RE.findall(text))
+
+
+def compact(text: str) -> str:
+    return " ".join(text.split())
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """``text`` cut to ``max_tokens`` approximate tokens, the closing ellipsis included"""
+    if approx_tokens(text) <= max_tokens:
+        return text
+    for i, match in enumerate(_TOKEN_RE.finditer(text)):
+        if i == max_tokens - 1:
+            return text[:match.start()].rstrip() + TRUNCATION_MARK
+    return text
+
+
+def _shares(costs: List[int], budget: int) -> List[int]:
+    """Token allowance per line: lines under an equal share keep everything, the rest split what is left"""
+    allowance = list(costs)
+    remaining = budget
+    pending = sorted(range(len(costs)), key=costs.__getitem__)
+    while pending:
+        share = max(MIN_LINE_TOKENS, remaining // len(pending))
+        if costs[pending[0]] > share:
+            for i in pending:
+                allowance[i] = share
+            break
+        i = pending.pop(0)
+        remaining -= costs[i]
+    return allowance
+
+
+@dataclass
+class Prompt:
+    text: str
+    tokens: int  # approximate, prefix included
+    prefix_tokens: int
+    truncated: int  # lines cut to fit the budget
+    dropped: int  # duplicate lines left out
+
+
+class PromptBuilder:
+    def __init__(self, prefix: str, budget: int = TOKEN_BUDGET):
+        self.prefix = prefix
+        self.prefix_tokens = approx_tokens(prefix)
+        self.budget = budget
+
+    def build(self, items: Sequence[Tuple[str, str]]) -> Prompt:
+        """Prefix plus one ``label: text`` line per item, within the token budget"""
+        seen = set()
+        lines: List[Tuple[str, str]] = []
+        for label, text in items:
+            line = (label, compact(text))
+            if line in seen:
+                continue
+            seen.add(line)
+            lines.append(line)
+
+        label_costs = [approx_tokens(label) + 1 for label, _ in lines]
+        text_costs = [approx_tokens(text) for _, text in lines]
+        available = self.budget - self.prefix_tokens - sum(label_costs)
+        truncated = 0
+        if sum(text_costs) > available:
+            for i, allowance in enumerate(_shares(text_costs, available)):
+                if text_costs[i] > allowance:
+                    label, text = lines[i]
+                    lines[i] = (label, truncate_tokens(text, allowance))
+                    text_costs[i] = allowance
+                    truncated += 1
+
+        text = self.prefix + "\n".join(f"{label}: {text}" for label, text in lines)
+        return Prompt(
+            text=text,
+            tokens=self.prefix_tokens + sum(label_costs) + sum(text_costs),
+            prefix_tokens=self.prefix_tokens,
+            truncated=truncated,
+            dropped=len(items) - len(lines),
+        )
+
+
+class PromptStats:
+    """Prompt sizes and Ollama prefill times of recent generations"""
+
+    def __init__(self, window: int = 1000):
+        self._samples: Deque[Tuple[int, Optional[int], Optional[float]]] = deque(maxlen=window)
+        self.prompts = 0
+        self.truncated = 0
+
+    def record(self, source: str, prompt: Prompt, result: Dict[str, Any], elapsed_ms: float) -> None:
+        """Log one generation; ``result`` is Ollama's final response object"""
+        eval_count = result.get("prompt_eval_count")
+        eval_ns = result.get("prompt_eval_duration")
+        prefill_ms = eval_ns / 1e6 if eval_ns is not None else None
+        self.prompts += 1
+        self.truncated += bool(prompt.truncated)
+        self._samples.append((prompt.tokens, eval_count, prefill_ms))
+        logger.info(
+            f"{source} prompt: {len(prompt.text)} chars, ~{prompt.tokens} tokens "
+            f"(prefix ~{prompt.prefix_tokens}, {prompt.truncated} lines truncated, {prompt.dropped} duplicates dropped); "
+            f"Ollama prefilled {eval_count if eval_count is not None else '?'} tokens in "
+            f"{f'{prefill_ms:.0f}ms' if prefill_ms is not None else '?'}, total {elapsed_ms:.0f}ms"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        approx = [s[0] for s in self._samples]
+        evaluated = [s[1] for s in self._samples if s[1] is not None]
+        prefill = sorted(s[2] for s in self._samples if s[2] is not None)
+        return {
+            "budget": TOKEN_BUDGET,
+            "prompts": self.prompts,
+            "truncated": self.truncated,
+            "approx_tokens_mean": mean(approx, 0.0),
+            "prompt_eval_count_mean": mean(evaluated),
+            "prefill_ms": {
+                "mean": mean(prefill),
+                "p95": p95(prefill),
+            },
+        }
+
+
+prompt_stats = PromptStats()
@@ -0,0 +1,96 @@
+"""Summary adapters by provider name, from the ``voice_precare.summary_adapters``
+entry point group (the built-in providers are always registered):
+
+    [project.entry-points."voice_precare.summary_adapters"]
+    my-llm = "my_package.adapter:MyLLMSummaryAdapter"
+
+    LLM_PROVIDER        provider used when a request does not name one (default rag)
+"""
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, List, Optional
+import inspect
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "voice_precare.summary_adapters"
+
+BUILTIN_ADAPTERS = {
+    "rule-based": "app.summary.rule_based:RuleBasedSummaryAdapter",
+    "ollama": "app.summary.ollama_adapter:OllamaSummaryAdapter",
+    "rag": "app.summary.rag_adapter:RAGSummaryAdapter",
+}
+
+
+class UnknownProviderError(ValueError):
+    pass
+
+
+def _import(target: str) -> Callable[..., Any]:
+    module_name, _, attr = target.partition(":")
+    return getattr(import_module(module_name), attr)
+
+
+def default_provider() -> str:
+    return os.getenv("LLM_PROVIDER", "rag")
+
+
+def is_inline(adapter: Any) -> bool:
+    return getattr(adapter, "inline", False)
+
+
+class SummaryAdapterRegistry:
+    def __init__(self):
+        self._adapters: Dict[str, Any] = {}
+        self.loaded = False
+
+    def load(self) -> None:
+        """Register built-in and entry point adapters and create one instance of each"""
+        if self.loaded:
+            return
+        factories: Dict[str, Callable[..., Any]] = {}
+        for name, target in BUILTIN_ADAPTERS.items():
+            factories[name] = _import(target)
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                factories[entry_point.name] = entry_point.load()
+            except Exception as e:
+                logger.warning(f"Summary adapter {entry_point.name} ({entry_point.value}) failed to load: {e}")
+
+        settings = {
+            "base_url": os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+            "model": os.getenv("OLLAMA_MODEL", "llama3.2"),
+        }
+        for name, factory in factories.items():
+            accepted = inspect.signature(factory).parameters
+            self._adapters[name] = factory(**{k: v for k, v in settings.items() if k in accepted})
+        self.loaded = True
+        logger.info(f"Summary adapters: {', '.join(self._adapters)} (default {default_provider()})")
+
+    def resolve(self, provider: Optional[str] = None) -> str:
+        """The name of the provider ``get(provider)`` serves; raises UnknownProviderError"""
+        self.load()
+        name = provider or default_provider()
+        if name not in self._adapters:
+            if provider is None:
+                # An unknown LLM_PROVIDER has always meant the rule-based summarizer
+                return "rule-based"
+            raise UnknownProviderError(f"Unknown summary provider {name!r}; available: {', '.join(self._adapters)}")
+        return name
+
+    def get(self, provider: Optional[str] = None) -> Any:
+        """The adapter for ``provider``, or for LLM_PROVIDER; raises UnknownProviderError"""
+        return self._adapters[self.resolve(provider)]
+
+    def names(self) -> List[str]:
+        self.load()
+        return list(self._adapters)
+
+    def adapters(self) -> List[Any]:
+        self.load()
+        return list(self._adapters.values())
+
+
+summary_adapters = SummaryAdapterRegistry()
@@ -1,27 +1,49 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
+from .step_index import StepIndex
+
+# step -> (summary field, whether every answer is kept or only the first);
+# shared by the full summary and the per-step update in apply_step
+STEP_FIELDS = {
+    "identification": ("patient_info", False),
+    "reason": ("main_complaint", False),
+    "onset": ("symptom_onset", False),
+    "history": ("relevant_history", True),
+    "allergies": ("allergies", True),
+}
+
+
+def apply_step(summary: Dict[str, Any], step: str, text: str) -> Optional[str]:
+    """Fold one confirmed answer into a rule-based summary in place; returns the field it changed, if any"""
+    target = STEP_FIELDS.get(step)
+    if target is None:
+        return None
+    field, keep_all = target
+    if keep_all:
+        summary.setdefault(field, []).append(text)
+    elif not summary.get(field):
+        summary[field] = text
+    else:
+        return None
+    return field
+
 
 class RuleBasedSummaryAdapter:
+    inline = True  # no I/O; the API answers with it directly instead of queueing a job
+
     async def summarize(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
         # Minimal passthrough; assumes upstream parsing already run
-        def first(step_key: str) -> str:
-            for s in steps:
-                if s.get("step") == step_key and s.get("confirmed"):
-                    return s.get("text", "")
-            return ""
-
-        relevant_history = [s.get("text", "") for s in steps if s.get("step") == "history" and s.get("confirmed")]
-        allergies = [s.get("text", "") for s in steps if s.get("step") == "allergies" and s.get("confirmed")]
-
-        return {
-            "patient_info": first("identification"),
-            "main_complaint": first("reason"),
-            "symptom_onset": first("onset"),
-            "relevant_history": relevant_history,
-            "allergies": allergies,
-            "red_flags": [],
-            "created_at": datetime.utcnow().isoformat(),
-        }
+        return self._summarize_index(StepIndex(steps))
 
+    async def summarize_batch(self, sessions: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Summaries for many sessions' step lists in one call, in the same order"""
+        return [self._summarize_index(StepIndex(steps)) for steps in sessions]
 
+    def _summarize_index(self, index: StepIndex) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            field: index.all(step) if keep_all else index.first(step) for step, (field, keep_all) in STEP_FIELDS.items()
+        }
+        summary["red_flags"] = []
+        summary["created_at"] = datetime.utcnow().isoformat()
+        return summary
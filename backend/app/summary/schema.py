@@ -0,0 +1,231 @@
+"""The summary object the LLM adapters ask Ollama for, its parser, and the
+retry budget for malformed output.
+
+    OLLAMA_FORMAT           "schema" (default), "json" (older Ollama) or "none"
+    LLM_PARSE_RETRIES       retries of one summary after malformed output (default 1)
+    LLM_RETRY_RATIO         retries allowed per first attempt, process-wide (default 0.2)
+"""
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+import json
+import os
+import time
+
+from .stats import mean, p95
+
+try:
+    import orjson
+
+    loads: Callable[[Union[str, bytes]], Any] = orjson.loads
+    JSON_LIBRARY = "orjson"
+except ImportError:
+    loads = json.loads
+    JSON_LIBRARY = "json"
+
+FORMAT = os.getenv("OLLAMA_FORMAT", "schema")
+PARSE_RETRIES = int(os.getenv("LLM_PARSE_RETRIES", "1"))
+RETRY_RATIO = float(os.getenv("LLM_RETRY_RATIO", "0.2"))
+
+SUMMARY_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "patient_info": {"type": "string"},
+        "main_complaint": {"type": "string"},
+        "symptom_onset": {"type": "string"},
+        "relevant_history": {"type": "array", "items": {"type": "string"}},
+        "allergies": {"type": "array", "items": {"type": "string"}},
+        "red_flags": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["patient_info", "main_complaint", "symptom_onset", "relevant_history", "allergies", "red_flags"],
+}
+
+
+class SummaryParseError(ValueError):
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+
+
+_TYPES = {"string": str, "array": list, "object": dict, "number": (int, float), "boolean": bool}
+
+
+def compile_validator(schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+    """A checker for ``schema`` (the object / string / array subset we use) that returns error messages.
+
+    The common case, a valid object, runs through plain boolean checks; the
+    messages are only worked out for values that fail them.
+    """
+    is_valid = _compile_check(schema)
+    explain = _compile_errors(schema)
+
+    def validate(value: Any) -> List[str]:
+        return [] if is_valid(value) else explain(value)
+
+    return validate
+
+
+def _compile_check(schema: Dict[str, Any]) -> Callable[[Any], bool]:
+    expected = _TYPES[schema["type"]]
+    if schema["type"] == "object":
+        properties = [(name, _compile_check(sub)) for name, sub in schema.get("properties", {}).items()]
+        required = tuple(schema.get("required", []))
+
+        def check_object(value: Any) -> bool:
+            if not isinstance(value, dict):
+                return False
+            for name in required:
+                if name not in value:
+                    return False
+            for name, check in properties:
+                if name in value and not check(value[name]):
+                    return False
+            return True
+
+        return check_object
+    if schema["type"] == "array":
+        if "items" not in schema:
+            return lambda value: isinstance(value, list)
+        check_item = _compile_check(schema["items"])
+
+        def check_array(value: Any) -> bool:
+            if not isinstance(value, list):
+                return False
+            for item in value:
+                if not check_item(item):
+                    return False
+            return True
+
+        return check_array
+    return lambda value: isinstance(value, expected)
+
+
+def _compile_errors(schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+    expected = _TYPES[schema["type"]]
+    if schema["type"] == "object":
+        properties = {name: _compile_errors(sub) for name, sub in schema.get("properties", {}).items()}
+        required = schema.get("required", [])
+
+        def object_errors(value: Any) -> List[str]:
+            if not isinstance(value, dict):
+                return [f"expected an object, got {type(value).__name__}"]
+            errors = [f"{name}: missing" for name in required if name not in value]
+            for name, errors_of in properties.items():
+                if name in value:
+                    errors.extend(f"{name}: {error}" for error in errors_of(value[name]))
+            return errors
+
+        return object_errors
+    if schema["type"] == "array":
+        item_errors = _compile_errors(schema["items"]) if "items" in schema else None
+
+        def array_errors(value: Any) -> List[str]:
+            if not isinstance(value, list):
+                return [f"expected an array, got {type(value).__name__}"]
+            if item_errors is None:
+                return []
+            return [f"[{i}] {error}" for i, item in enumerate(value) for error in item_errors(item)]
+
+        return array_errors
+
+    def scalar_errors(value: Any) -> List[str]:
+        return [] if isinstance(value, expected) else [f"expected {schema['type']}, got {type(value).__name__}"]
+
+    return scalar_errors
+
+
+validate_summary = compile_validator(SUMMARY_SCHEMA)
+# Per-field checks for streamed output, where fields arrive one at a time
+FIELD_VALIDATORS = {name: compile_validator(sub) for name, sub in SUMMARY_SCHEMA["properties"].items()}
+
+
+def request_format() -> Optional[Union[str, Dict[str, Any]]]:
+    """The ``format`` option for Ollama requests, or None to leave it out"""
+    if FORMAT == "schema":
+        return SUMMARY_SCHEMA
+    if FORMAT == "json":
+        return "json"
+    return None
+
+
+def _decode(text: str) -> Any:
+    try:
+        return loads(text)
+    except ValueError:
+        pass
+    # Servers that ignore ``format`` may wrap the object in prose
+    start = text.find("{")
+    end = text.rfind("}") + 1
+    if start < 0 or end <= start:
+        raise SummaryParseError("no_json", text[:80])
+    try:
+        return loads(text[start:end])
+    except ValueError as e:
+        raise SummaryParseError("invalid_json", str(e))
+
+
+class ParseStats:
+    """Parse outcomes and times of LLM responses, plus the retry budget they draw on"""
+
+    def __init__(self, retry_ratio: float = RETRY_RATIO, window: int = 1000):
+        self.retry_ratio = retry_ratio
+        self.parsed = 0
+        self.failures: Counter = Counter()
+        self.first_attempts = 0
+        self.retries = 0
+        self.retries_denied = 0
+        self._parse_us: Deque[float] = deque(maxlen=window)
+
+    def parse(self, text: str) -> Dict[str, Any]:
+        """A validated summary from a model response; raises SummaryParseError"""
+        start = time.perf_counter()
+        try:
+            summary = _decode(text)
+            errors = validate_summary(summary)
+            if errors:
+                raise SummaryParseError("schema", "; ".join(errors[:3]))
+        except SummaryParseError as e:
+            self.count(e.reason)
+            raise
+        finally:
+            self._parse_us.append((time.perf_counter() - start) * 1e6)
+        self.count(None)
+        return summary
+
+    def count(self, failure: Optional[str]) -> None:
+        """One response parsed (None) or failed for ``failure``; streams are checked field by field and count here"""
+        if failure is None:
+            self.parsed += 1
+        else:
+            self.failures[failure] += 1
+
+    def attempt(self, retry: bool) -> bool:
+        """Account for one LLM call; False when a retry is over the process-wide budget"""
+        if not retry:
+            self.first_attempts += 1
+            return True
+        if self.retries >= self.first_attempts * self.retry_ratio:
+            self.retries_denied += 1
+            return False
+        self.retries += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        times = sorted(self._parse_us)
+        failed = sum(self.failures.values())
+        return {
+            "library": JSON_LIBRARY,
+            "format": FORMAT,
+            "parsed": self.parsed,
+            "failed": failed,
+            "failure_rate": round(failed / (failed + self.parsed), 4) if failed + self.parsed else 0.0,
+            "failures": dict(self.failures),
+            "retries": self.retries,
+            "retries_denied": self.retries_denied,
+            "parse_us": {
+                "mean": mean(times, 0.0),
+                "p95": p95(times, 0.0),
+            },
+        }
+
+
+parse_stats = ParseStats()
@@ -0,0 +1,44 @@
+"""Rule-based draft shown while the LLM summary is generated; the final summary
+lists in ``agreed`` the fields both produced.
+
+    SPECULATIVE_SUMMARY     1 (default) runs the rule-based draft alongside LLM providers; 0 turns it off
+"""
+from typing import Any, Dict, FrozenSet, List, Optional, Union
+import os
+
+from .registry import is_inline, summary_adapters
+from .schema import SUMMARY_SCHEMA
+
+ENABLED = os.getenv("SPECULATIVE_SUMMARY", "1") == "1"
+
+
+def speculates(adapter: Any) -> bool:
+    """Whether a summary from ``adapter`` gets a rule-based draft; an inline adapter is its own draft"""
+    return ENABLED and not is_inline(adapter)
+
+
+async def draft(steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return await summary_adapters.get("rule-based").summarize(steps)
+
+
+def _normalize_text(value: Any) -> str:
+    return " ".join(str(value).casefold().split()).strip(" .,;")
+
+
+def _normalize(value: Any) -> Union[str, FrozenSet[str]]:
+    if isinstance(value, list):
+        return frozenset(text for text in map(_normalize_text, value) if text)
+    return _normalize_text(value) if value is not None else ""
+
+
+def agreed_fields(draft_summary: Optional[Dict[str, Any]], llm_summary: Optional[Dict[str, Any]]) -> List[str]:
+    """Summary fields the draft filled in and the LLM summary matches"""
+    if not draft_summary or not llm_summary:
+        return []
+    agreed = []
+    for name in SUMMARY_SCHEMA["properties"]:
+        expected = _normalize(draft_summary.get(name))
+        # An empty draft field only means the rules found nothing (red_flags always), not agreement
+        if expected and expected == _normalize(llm_summary.get(name)):
+            agreed.append(name)
+    return agreed
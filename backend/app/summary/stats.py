@@ -0,0 +1,11 @@
+"""Aggregates for the counters in /api/internal/summary-metrics."""
+from typing import Optional, Sequence
+
+
+def mean(samples: Sequence[float], empty: Optional[float] = None) -> Optional[float]:
+    return round(sum(samples) / len(samples), 1) if samples else empty
+
+
+def p95(ordered: Sequence[float], empty: Optional[float] = None) -> Optional[float]:
+    """95th percentile of already sorted samples"""
+    return round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1) if ordered else empty
@@ -0,0 +1,40 @@
+from typing import Any, Dict, List
+
+
+class StepIndex:
+    """Confirmed step texts grouped by step name, built in one pass over the step list.
+
+    The adapters used to rescan the whole list once per field; with an index
+    every field lookup is a dict access, however long the intake.
+    """
+
+    __slots__ = ("_texts",)
+
+    def __init__(self, steps: List[Dict[str, Any]]):
+        texts: Dict[str, List[str]] = {}
+        for s in steps:
+            if s.get("confirmed"):
+                name = s.get("step")
+                bucket = texts.get(name)
+                # Not setdefault: it would build a throwaway list for every step
+                if bucket is None:
+                    texts[name] = [s.get("text", "")]
+                else:
+                    bucket.append(s.get("text", ""))
+        self._texts = texts
+
+    def first(self, step: str) -> str:
+        """Text of the first confirmed answer to ``step``, or an empty string"""
+        texts = self._texts.get(step)
+        return texts[0] if texts else ""
+
+    def latest(self, step: str) -> str:
+        """Text of the last confirmed, non-empty answer to ``step`` (the patient's correction), or an empty string"""
+        for text in reversed(self._texts.get(step, ())):
+            if text:
+                return text
+        return ""
+
+    def all(self, step: str) -> List[str]:
+        """Texts of every confirmed answer to ``step``, in order"""
+        return list(self._texts.get(step, ()))
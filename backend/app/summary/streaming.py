@@ -0,0 +1,248 @@
+"""Streaming summary generation: each summary field is sent as soon as Ollama has written it."""
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import time
+
+from .admission import AdmissionRejected, llm_admission
+from .breaker import CircuitOpenError, llm_breaker
+from .base import FallbackSummary
+from .cache import summary_cache
+from .generate import request_body
+from .ollama_client import ollama_client
+from .prompts import Prompt, prompt_stats
+from . import speculative
+from .schema import FIELD_VALIDATORS, loads, parse_stats, validate_summary
+from .warmup import model_warmer
+
+SUMMARY_FIELDS = ("patient_info", "main_complaint", "symptom_onset", "relevant_history", "allergies", "red_flags")
+# Pseudo-field yielded last with the names of fields that came from the fallback, not the model
+FALLBACK_FIELDS = "_fallback_fields"
+
+
+class IncrementalJSONFieldParser:
+    """Feed text chunks of one JSON object; get back (key, value) per completed top-level field.
+
+    Text before the opening brace (model chatter) is skipped, and parsing stops
+    at the matching closing brace.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._start: Optional[int] = None  # start of the key or value being read
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self._text += chunk
+        fields: List[Tuple[str, Any]] = []
+        text = self._text
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._key is None:
+                            self._key = self._decode(self._start, i + 1)
+                            self._start = None
+                        else:
+                            self._emit(i + 1, fields)
+                continue
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._start = i
+            elif ch in "{[":
+                if self._depth == 1:
+                    self._start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    self._emit(i + 1, fields)
+                elif self._depth == 0:
+                    # End of the object; flush a trailing number / true / false / null
+                    self._emit(i, fields)
+                    self.done = True
+            elif ch == "," and self._depth == 1:
+                self._emit(i, fields)
+            elif self._depth == 1 and ch not in ": \t\r\n" and self._key is not None and self._start is None:
+                self._start = i
+        return fields
+
+    def _decode(self, start: int, end: int) -> Any:
+        return loads(self._text[start:end])
+
+    def _emit(self, end: int, fields: List[Tuple[str, Any]]) -> None:
+        if self._key is not None and self._start is not None:
+            try:
+                fields.append((self._key, self._decode(self._start, end)))
+            except ValueError:
+                pass
+        self._key = None
+        self._start = None
+
+
+async def stream_generate(
+    base_url: str, model: str, prompt: Prompt, options: Dict[str, Any], final: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[str]:
+    """Text chunks from Ollama's streaming /api/generate; the closing chunk (timings, token counts) goes into ``final``"""
+    async with ollama_client() as client:
+        async with client.stream(
+            "POST",
+            f"{base_url}/api/generate",
+            json=request_body(model, prompt, options, stream=True),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    if final is not None:
+                        final.update(chunk)
+                    return
+
+
+async def stream_llm_fields(
+    base_url: str,
+    model: str,
+    prompt: Prompt,
+    options: Dict[str, Any],
+    key: str,
+    fallback: Callable[[], Dict[str, Any]],
+    source: str = "stream",
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Yield summary fields as the model completes them.
+
+    Fields the model did not produce come from ``fallback``; their names follow as FALLBACK_FIELDS.
+    """
+    fields: Dict[str, Any] = {}
+    final: Dict[str, Any] = {}
+    parser = IncrementalJSONFieldParser()
+    try:
+        if llm_breaker.rejecting():
+            raise CircuitOpenError(f"LLM circuit breaker is {llm_breaker.state}")
+        async with llm_admission.slot():
+            start_time = time.perf_counter()
+            with llm_breaker.guard():
+                async for token in stream_generate(base_url, model, prompt, options, final):
+                    # Read on past the object: Ollama's prefill numbers only arrive with the closing chunk
+                    if parser.done:
+                        continue
+                    for name, value in parser.feed(token):
+                        check = FIELD_VALIDATORS.get(name)
+                        if check is None or check(value):
+                            # Unknown or mistyped; the fallback fills the field instead
+                            continue
+                        fields[name] = value
+                        yield name, value
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            prompt_stats.record(source, prompt, final, elapsed_ms)
+            model_warmer.record(final, elapsed_ms)
+    except (AdmissionRejected, CircuitOpenError) as e:
+        print(f"🤖 DEBUG: LLM unavailable, streaming fallback extraction: {e}")
+    except Exception as e:
+        print(f"🤖 DEBUG: Ollama streaming error: {e}")
+
+    if parser.done:
+        # Streamed fields cannot be retried, so a bad object is only counted and patched from the fallback
+        errors = validate_summary(fields)
+        parse_stats.count("schema" if errors else None)
+        if not errors:
+            await summary_cache.put(key, model, fields, (time.perf_counter() - start_time) * 1000)
+            return
+    filled = []
+    for name, value in fallback().items():
+        if name not in fields:
+            filled.append(name)
+            yield name, value
+    yield FALLBACK_FIELDS, filled
+
+
+async def summary_fields(adapter, steps: List[Dict[str, Any]]) -> AsyncIterator[Tuple[str, Any]]:
+    """(field, value) pairs from any adapter; ones without summarize_stream yield after summarize"""
+    if hasattr(adapter, "summarize_stream"):
+        async for name, value in adapter.summarize_stream(steps):
+            yield name, value
+        return
+    summary = await adapter.summarize(steps)
+    for name, value in summary.items():
+        yield name, value
+    if isinstance(summary, FallbackSummary):
+        yield FALLBACK_FIELDS, list(summary)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def summary_events(session_id: str, provider: Optional[str] = None) -> AsyncIterator[str]:
+    """Server-sent events for one streamed summary: ``draft`` with the rule-based summary for
+    LLM providers, ``field`` per completed field, then ``summary`` with the saved result (or ``error``)"""
+    from ..storage import async_crud, db
+    from ..storage.crud import SUMMARY_TIMEOUT, provisional_result
+    from .base import get_summary_adapter
+
+    async with db.AsyncSessionLocal() as session:
+        steps_payload, complete_transcript = await async_crud.load_summary_input(session, session_id)
+
+    adapter = get_summary_adapter(provider)
+    llm_summary: Dict[str, Any] = {}
+    fallback_fields: List[str] = []
+    fields = summary_fields(adapter, steps_payload)
+    draft = await speculative.draft(steps_payload) if speculative.speculates(adapter) else None
+    if draft is not None:
+        # Microseconds of rule extraction, sent before the model is even asked
+        yield _sse("draft", provisional_result(draft, session_id))
+    deadline = asyncio.get_running_loop().time() + SUMMARY_TIMEOUT
+    try:
+        while True:
+            # The deadline only covers waiting on the model, never our own yields to the client
+            async with asyncio.timeout_at(deadline):
+                try:
+                    name, value = await anext(fields)
+                except StopAsyncIteration:
+                    break
+            if name == FALLBACK_FIELDS:
+                fallback_fields = value
+            elif name in SUMMARY_FIELDS:
+                llm_summary[name] = value
+                yield _sse("field", {"field": name, "value": value})
+    except Exception as e:
+        print(f"🔍 DEBUG: Streaming summary error: {e}")
+    finally:
+        await fields.aclose()
+
+    try:
+        async with db.AsyncSessionLocal() as session:
+            model_fields = {name: value for name, value in llm_summary.items() if name not in fallback_fields}
+            if draft is None:
+                result = await async_crud.save_summary(session, session_id, complete_transcript, llm_summary or None)
+            elif not model_fields:
+                # The model gave nothing; the rules' own draft beats the adapter's rule-based fallback
+                result = await async_crud.save_summary(session, session_id, complete_transcript, draft)
+            else:
+                result = await async_crud.save_summary(
+                    session, session_id, complete_transcript, llm_summary, speculative.agreed_fields(draft, model_fields)
+                )
+        yield _sse("summary", result)
+    except Exception as e:
+        yield _sse("error", {"error": str(e)})
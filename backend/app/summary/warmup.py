@@ -0,0 +1,165 @@
+"""Keep the Ollama summary model loaded during working hours, and report cold
+and warm latencies separately.
+
+    OLLAMA_WARMUP                   "0" to skip preloading (default on)
+    OLLAMA_KEEP_ALIVE               keep_alive during working hours (default 30m; empty = Ollama's default)
+    OLLAMA_KEEP_ALIVE_OFF_HOURS     keep_alive outside them (default 5m)
+    OLLAMA_WORKING_HOURS            local HH:MM-HH:MM (default 07:00-19:00; empty = always)
+    OLLAMA_WARMUP_INTERVAL          idle seconds before a working-hours preload (default 300; keep below OLLAMA_KEEP_ALIVE)
+"""
+from collections import deque
+from datetime import datetime, time as dt_time
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+import asyncio
+import logging
+import os
+import time
+
+from .ollama_client import ollama_client
+from .stats import mean, p95
+
+logger = logging.getLogger(__name__)
+
+WARMUP = os.getenv("OLLAMA_WARMUP", "1") == "1"
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+KEEP_ALIVE_OFF_HOURS = os.getenv("OLLAMA_KEEP_ALIVE_OFF_HOURS", "5m")
+WORKING_HOURS = os.getenv("OLLAMA_WORKING_HOURS", "07:00-19:00")
+WARMUP_INTERVAL = float(os.getenv("OLLAMA_WARMUP_INTERVAL", "300"))
+COLD_LOAD_MS = 250.0
+
+
+def parse_working_hours(spec: str) -> Optional[Tuple[dt_time, dt_time]]:
+    """``"07:00-19:00"`` as (start, end); None for an empty spec (always working hours)"""
+    if not spec.strip():
+        return None
+    start, end = (datetime.strptime(part.strip(), "%H:%M").time() for part in spec.split("-"))
+    return start, end
+
+
+def in_hours(hours: Optional[Tuple[dt_time, dt_time]], now: dt_time) -> bool:
+    if hours is None:
+        return True
+    start, end = hours
+    if start <= end:
+        return start <= now < end
+    return now >= start or now < end  # a night shift, e.g. 22:00-06:00
+
+
+def _keep_alive_value(value: str) -> Union[str, int]:
+    # Ollama takes durations ("30m") or plain seconds; -1 keeps the model forever
+    return int(value) if value.lstrip("-").isdigit() else value
+
+
+class ModelWarmer:
+    def __init__(
+        self,
+        keep_alive: str = KEEP_ALIVE,
+        keep_alive_off_hours: str = KEEP_ALIVE_OFF_HOURS,
+        working_hours: str = WORKING_HOURS,
+        interval: float = WARMUP_INTERVAL,
+    ):
+        self.keep_alive_hours = keep_alive
+        self.keep_alive_off_hours = keep_alive_off_hours
+        self.hours = parse_working_hours(working_hours)
+        self.interval = interval
+        self.base_url: Optional[str] = None
+        self.model: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_used = 0.0  # monotonic time of the last request that reached the model
+        self.warmups = 0
+        self.last_warmup_ms: Optional[float] = None
+        self.last_load_ms: Optional[float] = None
+        self._cold_ms: Deque[float] = deque(maxlen=1000)
+        self._warm_ms: Deque[float] = deque(maxlen=1000)
+
+    def working_hours(self) -> bool:
+        return in_hours(self.hours, datetime.now().time())
+
+    def keep_alive(self) -> Optional[Union[str, int]]:
+        """``keep_alive`` for the next request, or None to leave Ollama's default"""
+        value = self.keep_alive_hours if self.working_hours() else self.keep_alive_off_hours
+        return _keep_alive_value(value) if value else None
+
+    def request_fields(self) -> Dict[str, Any]:
+        keep_alive = self.keep_alive()
+        return {"keep_alive": keep_alive} if keep_alive is not None else {}
+
+    async def start(self, base_url: str, model: str) -> None:
+        """Preload ``model`` in the background and keep it loaded through working hours"""
+        self.base_url = base_url
+        self.model = model
+        if not WARMUP:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        await self.warm()
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.working_hours() and time.monotonic() - self._last_used >= self.interval:
+                await self.warm()
+
+    async def warm(self) -> bool:
+        """Load the model now (an empty generate request); False if Ollama could not be reached"""
+        start_time = time.perf_counter()
+        try:
+            async with ollama_client() as client:
+                response = await client.post(
+                    f"{self.base_url}/api/generate",
+                    json={"model": self.model, **self.request_fields()},
+                )
+                response.raise_for_status()
+                result = response.json()
+        except Exception as e:
+            logger.warning(f"Warming Ollama model {self.model} failed: {e}")
+            return False
+        self.warmups += 1
+        self.last_warmup_ms = (time.perf_counter() - start_time) * 1000
+        self._last_used = time.monotonic()
+        load_ns = result.get("load_duration")
+        if load_ns is not None:
+            self.last_load_ms = load_ns / 1e6
+        logger.info(f"Ollama model {self.model} warm after {self.last_warmup_ms:.0f}ms (keep_alive={self.keep_alive()})")
+        return True
+
+    def record(self, result: Dict[str, Any], elapsed_ms: float) -> None:
+        """Count one generation as cold or warm from Ollama's ``load_duration``"""
+        self._last_used = time.monotonic()
+        load_ns = result.get("load_duration")
+        if load_ns is None:
+            return
+        self.last_load_ms = load_ns / 1e6
+        (self._cold_ms if self.last_load_ms >= COLD_LOAD_MS else self._warm_ms).append(elapsed_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        def latency(samples: Deque[float]) -> Dict[str, Any]:
+            ordered = sorted(samples)
+            return {
+                "count": len(ordered),
+                "mean_ms": mean(ordered),
+                "p95_ms": p95(ordered),
+            }
+
+        return {
+            "model": self.model,
+            "keep_alive": self.keep_alive(),
+            "working_hours": self.working_hours(),
+            "warmups": self.warmups,
+            "last_warmup_ms": round(self.last_warmup_ms, 1) if self.last_warmup_ms is not None else None,
+            "last_load_ms": round(self.last_load_ms, 1) if self.last_load_ms is not None else None,
+            "cold": latency(self._cold_ms),
+            "warm": latency(self._warm_ms),
+        }
+
+
+model_warmer = ModelWarmer()
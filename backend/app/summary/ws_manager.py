@@ -0,0 +1,75 @@
+import json
+from typing import Dict, Set
+from fastapi import WebSocket, WebSocketDisconnect
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryWebSocketManager:
+    """Pushes finished summary jobs to doctors watching an intake session"""
+
+    def __init__(self):
+        self.active_connections: Dict[str, Set[WebSocket]] = {}
+
+    async def connect(self, websocket: WebSocket, session_id: str):
+        await websocket.accept()
+        if session_id not in self.active_connections:
+            self.active_connections[session_id] = set()
+        self.active_connections[session_id].add(websocket)
+        logger.info(f"Summary WebSocket connected for session {session_id}")
+
+    def disconnect(self, websocket: WebSocket, session_id: str):
+        if session_id in self.active_connections:
+            self.active_connections[session_id].discard(websocket)
+            if not self.active_connections[session_id]:
+                del self.active_connections[session_id]
+        logger.info(f"Summary WebSocket disconnected for session {session_id}")
+
+    async def send_summary_generated(self, session_id: str, job_id: str, summary: dict):
+        await self._broadcast(session_id, {
+            "type": "summary_generated",
+            "jobId": job_id,
+            "sessionId": session_id,
+            "summary": summary,
+        })
+
+    async def send_summary_error(self, session_id: str, job_id: str, error: str):
+        await self._broadcast(session_id, {
+            "type": "summary_generation_error",
+            "jobId": job_id,
+            "sessionId": session_id,
+            "error": error,
+        })
+
+    async def _broadcast(self, session_id: str, message: dict):
+        if session_id not in self.active_connections:
+            return
+        disconnected = set()
+        for websocket in list(self.active_connections[session_id]):
+            try:
+                await websocket.send_text(json.dumps(message))
+            except Exception as e:
+                logger.warning(f"Failed to send summary message to WebSocket: {e}")
+                disconnected.add(websocket)
+
+        # Remove disconnected websockets
+        for websocket in disconnected:
+            self.disconnect(websocket, session_id)
+
+
+async def websocket_endpoint(websocket: WebSocket, session_id: str):
+    await summary_ws_manager.connect(websocket, session_id)
+    try:
+        while True:
+            # Keep connection alive
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        summary_ws_manager.disconnect(websocket, session_id)
+    except Exception as e:
+        logger.error(f"Summary WebSocket error: {e}")
+        summary_ws_manager.disconnect(websocket, session_id)
+
+
+# Global instance
+summary_ws_manager = SummaryWebSocketManager()
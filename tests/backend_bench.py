@@ -0,0 +1,93 @@
+"""
+Shared helpers for the backend benchmark scripts (bench_*.py).
+
+The benchmarks import the FastAPI backend in-process. Set DATABASE_URL to a
+Postgres instance (e.g. the docker-compose `db` service) to measure the real
+thing; otherwise a throwaway SQLite file is used so the scripts run anywhere.
+"""
+
+import os
+import sys
+import statistics
+import tempfile
+from typing import Dict, List
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+INTAKE_STEPS = ["greeting", "identification", "reason", "onset", "severity", "history", "allergies", "safety"]
+
+SAMPLE_ANSWERS = {
+    "greeting": "Hello",
+    "identification": "John Doe, born 03/15/1985, phone 555-123-4567",
+    "reason": "Headache and fever for the past week",
+    "onset": "Started last Monday",
+    "severity": "7 out of 10",
+    "history": "Hypertension since 2020",
+    "allergies": "Penicillin",
+    "safety": "No chest pain or shortness of breath",
+}
+
+
+def setup_backend(name: str = "bench") -> str:
+    """Make `app` importable and pick a database; returns the sync DATABASE_URL"""
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="voicecare-bench-"), f"{name}.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return os.environ["DATABASE_URL"]
+
+
+def migrate() -> None:
+    """Bring the benchmark database to the current schema revision"""
+    from app.storage import db, migrations
+    migrations.upgrade(db.engine)
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def sample_steps(count: int = 8, session_id: str = "bench") -> List[Dict]:
+    """Build a confirmed step payload of `count` entries cycling through the intake flow"""
+    steps = []
+    for i in range(count):
+        name = INTAKE_STEPS[i % len(INTAKE_STEPS)]
+        steps.append({
+            "step": name,
+            "text": SAMPLE_ANSWERS[name],
+            "language": "en",
+            "confirmed": True,
+            "ts": f"2025-01-01T00:00:{i % 60:02d}",
+        })
+    return steps
+
+
+def unique_steps(count: int = 8, tag: object = 0) -> List[Dict]:
+    """sample_steps with `tag` in every answer, so sessions never share a summary cache key or an in-flight LLM call"""
+    return [dict(s, text=f"{s['text']} ({tag})") for s in sample_steps(count)]
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {"count": 0, "min": 0.0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples_ms)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "min": ordered[0],
+        "mean": statistics.mean(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1],
+    }
+
+
+def print_stats(label: str, samples_ms: List[float]) -> None:
+    stats = percentiles(samples_ms)
+    print(f"  {label:<28} n={stats['count']:<6} mean={stats['mean']:8.2f}ms  "
+          f"p50={stats['p50']:8.2f}ms  p95={stats['p95']:8.2f}ms  p99={stats['p99']:8.2f}ms  max={stats['max']:8.2f}ms")
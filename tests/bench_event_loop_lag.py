@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Event-Loop Lag Benchmark for Intake Endpoints
+
+Runs concurrent intake traffic (create session, eight steps, review read,
+dashboard listing) inside one event loop, once through the synchronous
+`crud` helpers (the old handler behaviour) and once through `async_crud`,
+while a probe task measures how late the loop wakes up from short sleeps.
+
+On SQLite every statement is delayed by --query-latency-ms inside the driver
+to stand in for a network round trip to Postgres.
+
+Usage:
+    cd tests && python bench_event_loop_lag.py --flows 50 --query-latency-ms 2
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+from backend_bench import setup_backend, migrate, is_sqlite, print_stats, INTAKE_STEPS, SAMPLE_ANSWERS
+
+DATABASE_URL = setup_backend("event_loop_lag")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker  # noqa: E402
+
+from app.storage import db, crud, async_crud  # noqa: E402
+from app.storage.pool import instrument, pool_options  # noqa: E402
+
+PROBE_INTERVAL = 0.005
+
+
+def build_engines(latency_s: float):
+    """Return (sync_engine, async_engine); SQLite gets per-statement driver latency"""
+    if not is_sqlite(DATABASE_URL):
+        return db.engine, db.async_engine
+
+    def slow_statement(_sql):
+        time.sleep(latency_s)
+
+    sync_engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, _record):
+        dbapi_connection.set_trace_callback(slow_statement)
+
+    path = DATABASE_URL.split("sqlite:///", 1)[1]
+
+    async def async_creator():
+        import aiosqlite
+        # Flows now write on their own connections; wait out SQLite's single writer as Postgres would row locks
+        conn = await aiosqlite.connect(path, timeout=60)
+        # The trace callback runs on aiosqlite's worker thread, like a real network wait would
+        await conn.set_trace_callback(slow_statement)
+        return conn
+
+    # A file URL keeps the app's pool, so each session gets its own connection as in the app
+    async_url = db.to_async_url(DATABASE_URL)
+    async_engine = create_async_engine(async_url, async_creator=async_creator, **pool_options(async_url, is_async=True))
+    instrument(async_engine.sync_engine)
+    return sync_engine, async_engine
+
+
+async def lag_probe(stop: asyncio.Event, lags_ms: List[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags_ms.append(max(0.0, (time.perf_counter() - start - PROBE_INTERVAL) * 1000))
+
+
+async def sync_flow(factory, latencies_ms: List[float]) -> None:
+    """Old handler behaviour: sync crud called straight from async code"""
+    start = time.perf_counter()
+    with factory() as session:
+        sid = crud.create_session(session).session_id
+    for step in INTAKE_STEPS:
+        with factory() as session:
+            crud.save_step(session, session_id=sid, step=step, text=SAMPLE_ANSWERS[step], language="en", confirmed=True)
+        await asyncio.sleep(0)
+    with factory() as session:
+        crud.get_intake(session, sid)
+    with factory() as session:
+        crud.list_all_summaries(session)
+    latencies_ms.append((time.perf_counter() - start) * 1000)
+
+
+async def async_flow(factory, latencies_ms: List[float]) -> None:
+    start = time.perf_counter()
+    async with factory() as session:
+        sid = (await async_crud.create_session(session)).session_id
+    for step in INTAKE_STEPS:
+        async with factory() as session:
+            await async_crud.save_step(session, session_id=sid, step=step, text=SAMPLE_ANSWERS[step], language="en", confirmed=True)
+    async with factory() as session:
+        await async_crud.get_intake(session, sid)
+    async with factory() as session:
+        await async_crud.list_all_summaries(session)
+    latencies_ms.append((time.perf_counter() - start) * 1000)
+
+
+async def run_scenario(label: str, flow, factory, flows: int) -> None:
+    lags: List[float] = []
+    latencies: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(lag_probe(stop, lags))
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(flow(factory, latencies) for _ in range(flows)))
+    finally:
+        stop.set()
+        await probe
+    elapsed = time.perf_counter() - start
+
+    print(f"\n🔍 {label.upper()}  ({flows} concurrent intakes, {elapsed:.2f}s total)")
+    print_stats("event-loop lag", lags)
+    print_stats("intake flow latency", latencies)
+
+
+async def main_async(args) -> None:
+    migrate()
+    sync_engine, async_engine = build_engines(args.query_latency_ms / 1000)
+    sync_factory = sessionmaker(bind=sync_engine, autoflush=False)
+    async_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    print("⏱️  Event-Loop Lag Benchmark")
+    print("=" * 70)
+    print(f"Database: {DATABASE_URL}")
+    try:
+        await run_scenario("before: sync crud", sync_flow, sync_factory, args.flows)
+        await run_scenario("after: async crud", async_flow, async_factory, args.flows)
+    finally:
+        # aiosqlite connection threads keep the interpreter alive until closed
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flows", type=int, default=50, help="concurrent intake flows")
+    parser.add_argument("--query-latency-ms", type=float, default=2.0, help="simulated per-statement latency (SQLite only)")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Incremental Summary Benchmark
+
+Runs intakes through async_crud.save_step with the provisional summary off
+(the old behaviour) and on, then measures what the doctor waits for when
+opening the session: generating the rule-based summary from every step
+(old) against reading the one already kept up to date.
+
+Longer intakes (--steps) show that the per-step cost does not grow with
+the number of answers already saved.
+
+Usage:
+    cd tests && python bench_incremental_summary.py --intakes 50 --steps 8
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import List
+
+from backend_bench import setup_backend, migrate, print_stats, sample_steps
+
+setup_backend("incremental_summary")
+os.environ["LLM_PROVIDER"] = "rule-based"
+
+from app.storage import db, async_crud  # noqa: E402
+from app.summary import incremental  # noqa: E402
+
+
+async def run_intakes(label: str, intakes: int, steps: int) -> List[str]:
+    save_ms: List[float] = []
+    session_ids = []
+    for _ in range(intakes):
+        async with db.AsyncSessionLocal() as session:
+            sid = (await async_crud.create_session(session)).session_id
+        session_ids.append(sid)
+        # Without --steps 8 the intake would reach safety early; keep it for the end
+        for s in sample_steps(steps)[:-1] + sample_steps(8)[-1:]:
+            start = time.perf_counter()
+            async with db.AsyncSessionLocal() as session:
+                await async_crud.save_step(session, sid, s["step"], s["text"], s["language"], s["confirmed"])
+            save_ms.append((time.perf_counter() - start) * 1000)
+    print_stats(f"save_step ({label})", save_ms)
+    return session_ids
+
+
+async def open_summaries(label: str, session_ids: List[str], generate: bool) -> None:
+    open_ms: List[float] = []
+    for sid in session_ids:
+        start = time.perf_counter()
+        async with db.AsyncSessionLocal() as session:
+            if generate:
+                await async_crud.generate_summary(session, sid)
+            summary = await async_crud.get_saved_summary(session, sid)
+        open_ms.append((time.perf_counter() - start) * 1000)
+        assert summary and summary["structured_summary"]["main_complaint"], sid
+    print_stats(f"doctor opens ({label})", open_ms)
+
+
+async def main_async(args) -> None:
+    migrate()
+    print(f"\n📊 {args.intakes} intakes of {args.steps} steps, rule-based provider")
+
+    incremental.ENABLED = False
+    old = await run_intakes("old", args.intakes, args.steps)
+    incremental.ENABLED = True
+    new = await run_intakes("provisional", args.intakes, args.steps)
+
+    await open_summaries("generate + read", old, generate=True)
+    await open_summaries("read provisional", new, generate=False)
+    await db.async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--intakes", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+LLM Circuit Breaker Outage Benchmark
+
+The stub Ollama server (tests/stub_ollama.py) is switched to "down": it
+accepts requests and never answers, like a hung Ollama. Summaries are timed
+during the outage with the breaker effectively disabled (every call waits
+out OLLAMA_TIMEOUT) and enabled (after LLM_BREAKER_FAILURES timeouts the
+rule-based fallback answers immediately). The stub then recovers, and one
+call after the cool-down shows the half-open probe closing the breaker.
+
+OLLAMA_TIMEOUT defaults to 30s in the app; --timeout scales it down so the
+run finishes quickly.
+
+Usage:
+    cd tests && python bench_llm_breaker.py --requests 20 --timeout 1
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import time
+from typing import List
+
+from backend_bench import setup_backend, print_stats, sample_steps
+from stub_ollama import StubOllama
+
+setup_backend("llm_breaker")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="summaries timed during the outage, per setup")
+    parser.add_argument("--timeout", type=float, default=1.0, help="OLLAMA_TIMEOUT in seconds")
+    parser.add_argument("--cooldown", type=float, default=2.0, help="LLM_BREAKER_COOLDOWN in seconds")
+    return parser.parse_args()
+
+
+async def timed_summaries(adapter, steps, count: int) -> List[float]:
+    from app.summary.cache import summary_cache
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(count):
+            summary_cache.clear()
+            start = time.perf_counter()
+            await adapter.summarize(steps)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main_async(args) -> None:
+    from app.summary import ollama_client
+    from app.summary.base import get_summary_adapter
+    from app.summary.breaker import llm_breaker
+
+    print("⏱️  LLM Circuit Breaker Outage Benchmark")
+    print("=" * 70)
+    logging.basicConfig(level=logging.WARNING, format="  📝 %(message)s")
+    logging.getLogger("app.summary.breaker").setLevel(logging.INFO)
+    steps = sample_steps(8)
+
+    with StubOllama() as stub:
+        os.environ["OLLAMA_BASE_URL"] = stub.url
+        os.environ["LLM_PROVIDER"] = "rag"
+        print(f"Stub Ollama: {stub.url} (OLLAMA_TIMEOUT={args.timeout}s, cool-down {args.cooldown}s)")
+        await ollama_client.start()
+        adapter = get_summary_adapter()
+        stub.down = True
+
+        first = llm_breaker.failure_threshold
+        for label, threshold in (("no breaker", 10 ** 9), (f"breaker, opens after {first} failures", first)):
+            llm_breaker.__init__(failure_threshold=threshold, cooldown=args.cooldown)
+            print(f"\n📊 Ollama down, {label}")
+            samples = await timed_summaries(adapter, steps, args.requests)
+            print_stats("all summaries", samples)
+            print_stats(f"after the first {first}", samples[first:])
+            print(f"  state={llm_breaker.state} short_circuited={llm_breaker.short_circuited}")
+
+        print("\n📊 Recovery")
+        stub.down = False
+        await asyncio.sleep(args.cooldown)
+        probe = await timed_summaries(adapter, steps, 1)
+        print(f"  first summary after the cool-down (half-open probe): {probe[0]:.1f}ms, state={llm_breaker.state}")
+        await ollama_client.close()
+
+
+def main():
+    args = parse_args()
+    # Read by app.summary.ollama_client / breaker at import time
+    os.environ["OLLAMA_TIMEOUT"] = str(args.timeout)
+    os.environ["LLM_BREAKER_COOLDOWN"] = str(args.cooldown)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Summary Adapter HTTP Overhead Benchmark
+
+Runs the Ollama and RAG summary adapters against a local stub Ollama server
+(tests/stub_ollama.py) and compares:
+
+  per-call client   a new httpx.AsyncClient per summary (the old behaviour,
+                    and still what callers outside the app loop get)
+  shared client     the pooled, keep-alive client opened at app startup
+
+The stub answers instantly by default, so the difference is the per-summary
+connection and client setup cost. TCP connections opened are reported too.
+
+Usage:
+    cd tests && python bench_ollama_client.py --iterations 200 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+from typing import List
+
+from backend_bench import setup_backend, print_stats, unique_steps
+from stub_ollama import StubOllama
+
+setup_backend("ollama_client")
+# Every summary has to reach the stub; cache hits would skip the HTTP call being measured
+os.environ["SUMMARY_CACHE_SIZE"] = "0"
+os.environ["SUMMARY_CACHE_DB"] = "0"
+
+from app.summary import ollama_client  # noqa: E402
+from app.summary.base import get_summary_adapter  # noqa: E402
+
+
+async def timed_summaries(iterations: int, concurrency: int) -> List[float]:
+    adapter = get_summary_adapter()
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            summary = await adapter.summarize(unique_steps(8, i))
+            samples.append((time.perf_counter() - start) * 1000)
+            assert summary.get("main_complaint")
+
+    # The adapters print debug output on every call
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(one(i) for i in range(iterations)))
+    return samples
+
+
+async def main_async(args) -> None:
+    print("⏱️  Summary Adapter HTTP Overhead Benchmark")
+    print("=" * 70)
+
+    with StubOllama(delay=args.delay) as stub:
+        os.environ["OLLAMA_BASE_URL"] = stub.url
+        print(f"Stub Ollama: {stub.url} (delay {args.delay * 1000:.0f}ms)")
+
+        for provider in ("ollama", "rag"):
+            os.environ["LLM_PROVIDER"] = provider
+            print(f"\n📊 {provider} adapter, {args.iterations} summaries, concurrency {args.concurrency}")
+
+            stub.reset_counters()
+            samples = await timed_summaries(args.iterations, args.concurrency)
+            print_stats("per-call client", samples)
+            print(f"  {'':<28} connections opened: {stub.connections}")
+
+            await ollama_client.start()
+            stub.reset_counters()
+            samples = await timed_summaries(args.iterations, args.concurrency)
+            print_stats("shared client", samples)
+            print(f"  {'':<28} connections opened: {stub.connections}")
+            await ollama_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--delay", type=float, default=0.0, help="stub generation delay in seconds")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
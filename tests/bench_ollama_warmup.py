@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Ollama Cold vs Warm Summary Benchmark
+
+The stub Ollama server (tests/stub_ollama.py) is run with a model load delay
+and a short default keep-alive, so an idle model unloads as Ollama's does.
+Two setups are compared:
+
+  unmanaged   no keep_alive and no warm-up: the first summary after startup,
+              and the first after an idle gap, pay the load
+  managed     app.summary.warmup: preload at startup, keep_alive on every
+              request, so both stay warm
+
+Usage:
+    cd tests && python bench_ollama_warmup.py --load-delay 2 --idle 3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+
+from backend_bench import setup_backend, sample_steps
+from stub_ollama import StubOllama
+
+setup_backend("ollama_warmup")
+
+from app.summary import ollama_client  # noqa: E402
+from app.summary.base import get_summary_adapter  # noqa: E402
+from app.summary.cache import summary_cache  # noqa: E402
+from app.summary.warmup import model_warmer  # noqa: E402
+
+
+async def timed_summary(adapter, steps) -> float:
+    summary_cache.clear()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await adapter.summarize(steps)
+    return (time.perf_counter() - start) * 1000
+
+
+async def scenario(name: str, stub: StubOllama, adapter, steps, idle: float, managed: bool) -> None:
+    stub.unload()
+    stub.reset_counters()
+    model_warmer.keep_alive_hours = model_warmer.keep_alive_off_hours = "10m" if managed else ""
+    print(f"\n📊 {name}")
+    if managed:
+        start = time.perf_counter()
+        await model_warmer.warm()
+        print(f"  startup warm-up (in the background) {(time.perf_counter() - start) * 1000:9.1f}ms")
+    print(f"  first summary after startup         {await timed_summary(adapter, steps):9.1f}ms")
+    print(f"  next summary                        {await timed_summary(adapter, steps):9.1f}ms")
+    await asyncio.sleep(idle)
+    print(f"  first summary after {idle:.0f}s idle         {await timed_summary(adapter, steps):9.1f}ms")
+    print(f"  model loads: {stub.loads}")
+
+
+async def main_async(args) -> None:
+    print("⏱️  Ollama Cold vs Warm Summary Benchmark")
+    print("=" * 70)
+    steps = sample_steps(8)
+
+    # Ollama's default keep-alive, scaled down so the idle gap outlasts it
+    with StubOllama(delay=args.llm_delay, load_delay=args.load_delay, default_keep_alive=args.idle / 2) as stub:
+        os.environ["OLLAMA_BASE_URL"] = stub.url
+        os.environ["LLM_PROVIDER"] = "ollama"
+        print(f"Stub Ollama: {stub.url} (load {args.load_delay * 1000:.0f}ms, "
+              f"generation {args.llm_delay * 1000:.0f}ms, default keep-alive {args.idle / 2:.1f}s)")
+        await ollama_client.start()
+        adapter = get_summary_adapter()
+        model_warmer.base_url, model_warmer.model = adapter.base_url, adapter.model
+
+        await scenario("unmanaged (no keep_alive, no warm-up)", stub, adapter, steps, args.idle, managed=False)
+        await scenario("managed (warm-up + keep_alive=10m)", stub, adapter, steps, args.idle, managed=True)
+
+        stats = model_warmer.stats()
+        print(f"\n📈 summary-metrics \"model\": cold {stats['cold']}, warm {stats['warm']}")
+        await ollama_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--load-delay", type=float, default=2.0, help="stub model load time in seconds")
+    parser.add_argument("--llm-delay", type=float, default=0.2, help="stub generation time in seconds")
+    parser.add_argument("--idle", type=float, default=3.0, help="idle gap in seconds; the stub's default keep-alive is half of it")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
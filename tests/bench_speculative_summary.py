@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Speculative Summary Time-to-Content Benchmark
+
+Runs the SSE summary stream (app.summary.streaming.summary_events) against
+the stub Ollama server, which spreads its canned summary over --llm-delay
+seconds, with the rule-based draft off (the old behaviour) and on. Reports
+when the doctor first has something to read (the draft event, else the first
+LLM field) and when the saved summary arrives, plus the fields the LLM and
+the draft agreed on.
+
+Usage:
+    cd tests && python bench_speculative_summary.py --llm-delay 2 --iterations 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import time
+from typing import Dict, List
+
+from backend_bench import setup_backend, migrate, print_stats, INTAKE_STEPS, SAMPLE_ANSWERS
+from stub_ollama import StubOllama
+
+setup_backend("speculative_summary")
+
+from app.storage import db, async_crud  # noqa: E402
+from app.summary import ollama_client, speculative  # noqa: E402
+from app.summary.cache import summary_cache  # noqa: E402
+from app.summary.streaming import summary_events  # noqa: E402
+
+
+async def stream_once(session_id: str) -> Dict[str, float]:
+    start = time.perf_counter()
+    marks: Dict[str, float] = {}
+    async for event in summary_events(session_id):
+        name = event.split("\n", 1)[0].removeprefix("event: ")
+        elapsed = (time.perf_counter() - start) * 1000
+        if name in ("draft", "field"):
+            marks.setdefault("first content", elapsed)
+        if name == "summary":
+            marks["saved summary"] = elapsed
+            marks["agreed"] = json.loads(event.split("data: ", 1)[1]).get("agreed")
+    return marks
+
+
+async def main_async(args) -> None:
+    migrate()
+    async with db.AsyncSessionLocal() as session:
+        session_id = (await async_crud.create_session(session)).session_id
+        await async_crud.save_steps(session, session_id, [
+            {"step": step, "text": SAMPLE_ANSWERS[step], "language": "en", "confirmed": True}
+            for step in INTAKE_STEPS if step != "safety"
+        ])
+
+    with StubOllama(delay=args.llm_delay) as stub:
+        os.environ["OLLAMA_BASE_URL"] = stub.url
+        os.environ["LLM_PROVIDER"] = "rag"
+        print(f"Stub Ollama: {stub.url} (generation {args.llm_delay * 1000:.0f}ms)")
+        await ollama_client.start()
+
+        for label, enabled in (("LLM only (old)", False), ("rule-based draft", True)):
+            speculative.ENABLED = enabled
+            results: Dict[str, List[float]] = {"first content": [], "saved summary": []}
+            agreed = None
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(args.iterations):
+                    summary_cache.clear()
+                    marks = await stream_once(session_id)
+                    agreed = marks.pop("agreed", None)
+                    for name, ms in marks.items():
+                        results[name].append(ms)
+
+            print(f"\n📊 {label}, {args.iterations} iterations")
+            for name, samples in results.items():
+                print_stats(name, samples)
+            print(f"  agreed fields: {agreed}")
+
+        await ollama_client.close()
+    await db.async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--llm-delay", type=float, default=2.0, help="stub generation time in seconds")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
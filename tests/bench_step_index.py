@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Rule-Based Summarizer Micro-Benchmark
+
+Times RuleBasedSummaryAdapter.summarize on step lists of 8 to 10,000 entries,
+against the previous implementation that rescanned the list once per field,
+and summarize_batch against one summarize call per session.
+
+Usage:
+    cd tests && python bench_step_index.py
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from backend_bench import setup_backend, percentiles, sample_steps
+
+setup_backend("step_index")
+
+from app.summary.rule_based import RuleBasedSummaryAdapter  # noqa: E402
+from app.summary.step_index import StepIndex  # noqa: E402
+
+SIZES = [8, 100, 1_000, 10_000]
+
+
+def per_field_scan(steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The old RuleBasedSummaryAdapter.summarize body: one pass over the steps per field"""
+    def first(step_key: str) -> str:
+        for s in steps:
+            if s.get("step") == step_key and s.get("confirmed"):
+                return s.get("text", "")
+        return ""
+
+    relevant_history = [s.get("text", "") for s in steps if s.get("step") == "history" and s.get("confirmed")]
+    allergies = [s.get("text", "") for s in steps if s.get("step") == "allergies" and s.get("confirmed")]
+    return {
+        "patient_info": first("identification"),
+        "main_complaint": first("reason"),
+        "symptom_onset": first("onset"),
+        "relevant_history": relevant_history,
+        "allergies": allergies,
+        "red_flags": [],
+        "created_at": datetime.utcnow().isoformat(),
+    }
+
+
+def late_answers(count: int) -> List[Dict[str, Any]]:
+    """Worst case for the old scan: the fields being looked up only appear at the end"""
+    steps = [{**s, "step": "chat"} for s in sample_steps(max(0, count - 8))]
+    return steps + sample_steps(min(count, 8))
+
+
+def time_calls(fn, repeat: int, inner: int) -> List[float]:
+    """Microseconds per call, each sample averaged over ``inner`` calls"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        samples.append((time.perf_counter() - start) * 1e6 / inner)
+    return samples
+
+
+def print_us(label: str, samples_us: List[float]) -> None:
+    stats = percentiles(samples_us)
+    print(f"  {label:<28} n={stats['count']:<6} mean={stats['mean']:9.2f}µs  "
+          f"p50={stats['p50']:9.2f}µs  p95={stats['p95']:9.2f}µs  max={stats['max']:9.2f}µs")
+
+
+async def main_async(args) -> None:
+    print("⏱️  Rule-Based Summarizer Micro-Benchmark")
+    print("=" * 70)
+    adapter = RuleBasedSummaryAdapter()
+
+    for size in SIZES:
+        steps = late_answers(size)
+        expected = per_field_scan(steps)
+        got = await adapter.summarize(steps)
+        assert {k: v for k, v in got.items() if k != "created_at"} == {k: v for k, v in expected.items() if k != "created_at"}
+
+        inner = max(1, 10_000 // size)
+        print(f"\n📊 {size} steps, {args.repeat} samples x {inner} calls")
+        print_us("per-field scans (old)", time_calls(lambda: per_field_scan(steps), args.repeat, inner))
+        # summarize never awaits, so time its synchronous body directly
+        print_us("step index", time_calls(lambda: adapter._summarize_index(StepIndex(steps)), args.repeat, inner))
+
+    sessions = [sample_steps(8) for _ in range(args.sessions)]
+    print(f"\n📊 {args.sessions} sessions x 8 steps, as app.summary.batch drives them")
+    per_session: List[float] = []
+    batched: List[float] = []
+    for _ in range(max(1, args.repeat // 10)):
+        start = time.perf_counter()
+        await asyncio.gather(*(asyncio.wait_for(adapter.summarize(steps), timeout=30) for steps in sessions))
+        per_session.append((time.perf_counter() - start) * 1e6)
+        start = time.perf_counter()
+        await adapter.summarize_batch(sessions)
+        batched.append((time.perf_counter() - start) * 1e6)
+    print_us("gather(summarize) per chunk", per_session)
+    print_us("summarize_batch per chunk", batched)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="samples per measurement")
+    parser.add_argument("--sessions", type=int, default=1000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Step Ingestion Latency Benchmark
+
+Compares saving an intake through N calls to POST /api/intake/{id}/step
+against one call to the batched POST /api/intake/{id}/steps, for 1, 8 and
+100 steps. Requests go through the ASGI app in-process, so the numbers are
+handler + insert cost (summary upkeep is turned off); real clients also pay
+one network round trip per request on the per-step path.
+
+Usage:
+    cd tests && python bench_step_ingestion.py --iterations 20
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+from backend_bench import setup_backend, migrate, print_stats, sample_steps
+
+DATABASE_URL = setup_backend("step_ingestion")
+# Measure the inserts alone: no provisional summary fold per step, and no LLM summary jobs queued
+os.environ["INCREMENTAL_SUMMARY"] = "0"
+os.environ["LLM_PROVIDER"] = "rule-based"
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+STEP_COUNTS = [1, 8, 100]
+
+
+def step_payload(count: int) -> List[Dict]:
+    return [{k: s[k] for k in ("step", "language", "text", "confirmed")} for s in sample_steps(count)]
+
+
+async def per_step(client: httpx.AsyncClient, steps: List[Dict]) -> float:
+    sid = (await client.post("/api/intake/sessions")).json()["sessionId"]
+    start = time.perf_counter()
+    for step in steps:
+        response = await client.post(f"/api/intake/{sid}/step", json=step)
+        response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+async def batched(client: httpx.AsyncClient, steps: List[Dict]) -> float:
+    sid = (await client.post("/api/intake/sessions")).json()["sessionId"]
+    start = time.perf_counter()
+    response = await client.post(f"/api/intake/{sid}/steps", json=steps)
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+async def main_async(args) -> None:
+    print("⏱️  Step Ingestion Latency Benchmark")
+    print("=" * 70)
+    print(f"Database: {DATABASE_URL}")
+
+    migrate()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for count in STEP_COUNTS:
+                steps = step_payload(count)
+                results: Dict[str, List[float]] = {"per-step": [], "batched": []}
+                for _ in range(args.iterations):
+                    results["per-step"].append(await per_step(client, steps))
+                    results["batched"].append(await batched(client, steps))
+
+                print(f"\n📊 {count} step(s), {args.iterations} iterations")
+                for label, samples in results.items():
+                    print_stats(label, samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
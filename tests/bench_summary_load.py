@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Summary Generation Load Test
+
+How many concurrent summary requests can one worker sustain? Drives
+generate_summary against a stub Ollama server (tests/stub_ollama.py, with
+--llm-delay standing in for model latency) at increasing concurrency, two ways:
+
+  threadpool bridge   sync crud.generate_summary in the threadpool, with a
+                      fresh event loop and HTTP client per summary (the old
+                      POST /api/intake/{id}/summary path)
+  async               async_crud.generate_summary awaited on the app loop
+                      with the shared pooled client (the current path)
+
+Each level runs `concurrency` clients back to back until --requests summaries
+are done, and reports throughput and latency.
+
+Usage:
+    cd tests && python bench_summary_load.py --levels 10,50,100,200 --llm-delay 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+from typing import Awaitable, Callable, List
+
+from backend_bench import setup_backend, migrate, print_stats, unique_steps
+from stub_ollama import StubOllama
+
+DATABASE_URL = setup_backend("summary_load")
+os.environ.setdefault("LLM_PROVIDER", "rag")
+# Sessions are summarized repeatedly; cache hits would skip the LLM round trip under test
+os.environ["SUMMARY_CACHE_SIZE"] = "0"
+os.environ["SUMMARY_CACHE_DB"] = "0"
+# Compares the call paths, not admission control: by default neither path queues for an LLM slot
+os.environ.setdefault("LLM_CONCURRENCY", "1000")
+os.environ.setdefault("LLM_MAX_WAITING", "1000")
+
+from fastapi.concurrency import run_in_threadpool  # noqa: E402
+
+from app.storage import db, crud, async_crud  # noqa: E402
+from app.summary import ollama_client  # noqa: E402
+
+
+def seed_sessions(count: int) -> List[str]:
+    sids = []
+    with db.SessionLocal() as session:
+        for i in range(count):
+            sid = crud.create_session(session).session_id
+            # Distinct answers per session, so concurrent summaries are not coalesced into one LLM call
+            for s in unique_steps(8, i):
+                crud.save_step(session, sid, s["step"], s["text"], s["language"], s["confirmed"])
+            sids.append(sid)
+    return sids
+
+
+async def threadpool_bridge(sid: str) -> dict:
+    def run() -> dict:
+        with db.SessionLocal() as session:
+            return crud.generate_summary(session, sid)
+    return await run_in_threadpool(run)
+
+
+async def async_path(sid: str) -> dict:
+    async with db.AsyncSessionLocal() as session:
+        return await async_crud.generate_summary(session, sid)
+
+
+async def run_level(generate: Callable[[str], Awaitable[dict]], sids: List[str], concurrency: int, total: int):
+    latencies: List[float] = []
+    errors = 0
+    queue = list(range(total))
+
+    async def client():
+        nonlocal errors
+        while queue:
+            i = queue.pop()
+            start = time.perf_counter()
+            try:
+                summary = await generate(sids[i % len(sids)])
+                if not summary.get("main_complaint"):
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def main_async(args) -> None:
+    print("⏱️  Summary Generation Load Test")
+    print("=" * 70)
+    print(f"Database: {DATABASE_URL}")
+    migrate()
+    sids = seed_sessions(args.sessions)
+
+    with StubOllama(delay=args.llm_delay) as stub:
+        os.environ["OLLAMA_BASE_URL"] = stub.url
+        print(f"Stub Ollama: {stub.url} (delay {args.llm_delay * 1000:.0f}ms), provider {os.environ['LLM_PROVIDER']}")
+
+        for concurrency in [int(c) for c in args.levels.split(",")]:
+            total = max(args.requests, concurrency)
+            print(f"\n📊 concurrency {concurrency}, {total} summaries")
+            for label, generate, shared_client in (
+                ("threadpool bridge", threadpool_bridge, False),
+                ("async", async_path, True),
+            ):
+                if shared_client:
+                    await ollama_client.start()
+                # Both paths print per-summary debug output
+                with contextlib.redirect_stdout(io.StringIO()):
+                    latencies, errors, elapsed = await run_level(generate, sids, concurrency, total)
+                if shared_client:
+                    await ollama_client.close()
+                print_stats(label, latencies)
+                print(f"  {'':<28} throughput={total / elapsed:7.1f}/s  errors={errors}")
+
+    await db.async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="10,50,100,200", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=400, help="summaries per level (at least the concurrency)")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--llm-delay", type=float, default=0.2, help="stub generation delay in seconds")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
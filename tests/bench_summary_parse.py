@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+LLM Summary Parsing Benchmark
+
+1. Parse time for one model response, with the previous approach (find the
+   outermost braces, json.loads, no validation) and app.summary.schema
+   (orjson when installed, plus the compiled six-field validator).
+2. Against the stub Ollama server (tests/stub_ollama.py) answering every
+   --malformed-every-th generation with broken JSON: how many summaries end
+   in the fallback extraction with and without the retry budget.
+
+Usage:
+    cd tests && python bench_summary_parse.py --summaries 200 --malformed-every 5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import time
+from typing import Any, Dict
+
+from backend_bench import setup_backend, percentiles, sample_steps
+from stub_ollama import CANNED_SUMMARY, StubOllama
+
+setup_backend("summary_parse")
+
+from app.summary import generate, ollama_client  # noqa: E402
+from app.summary.base import get_summary_adapter  # noqa: E402
+from app.summary.cache import summary_cache  # noqa: E402
+from app.summary.schema import JSON_LIBRARY, ParseStats, parse_stats  # noqa: E402
+
+
+def brace_parse(text: str) -> Dict[str, Any]:
+    """What both adapters did before: outermost braces, json.loads"""
+    start = text.find("{")
+    end = text.rfind("}") + 1
+    return json.loads(text[start:end])
+
+
+def time_parse(label: str, fn, text: str, repeat: int) -> None:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1e6)
+    stats = percentiles(samples)
+    print(f"  {label:<28} n={stats['count']:<6} mean={stats['mean']:7.2f}µs  p50={stats['p50']:7.2f}µs  p95={stats['p95']:7.2f}µs")
+
+
+async def run_summaries(adapter, steps, count: int) -> int:
+    """Summaries that came back as the fallback instead of the model's answer"""
+    fallbacks = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(count):
+            summary_cache.clear()
+            if await adapter.summarize(steps) != CANNED_SUMMARY:
+                fallbacks += 1
+    return fallbacks
+
+
+async def main_async(args) -> None:
+    print("⏱️  LLM Summary Parsing Benchmark")
+    print("=" * 70)
+
+    response = json.dumps(CANNED_SUMMARY)
+    checker = ParseStats()
+    print(f"\n📊 Parsing one response, {args.repeat} runs (JSON library: {JSON_LIBRARY})")
+    time_parse("braces + json.loads (old)", brace_parse, response, args.repeat)
+    time_parse("schema.parse (validated)", checker.parse, response, args.repeat)
+
+    steps = sample_steps(8)
+    logging.getLogger("app.summary.generate").setLevel(logging.ERROR)  # one warning per malformed answer
+    with StubOllama(malformed_every=args.malformed_every) as stub:
+        os.environ["OLLAMA_BASE_URL"] = stub.url
+        os.environ["LLM_PROVIDER"] = "rag"
+        await ollama_client.start()
+        adapter = get_summary_adapter()
+
+        print(f"\n📊 {args.summaries} summaries, every {args.malformed_every}th generation malformed")
+        for label, retries in (("no retries (old)", 0), ("LLM_PARSE_RETRIES=1", 1)):
+            generate.PARSE_RETRIES = retries
+            stub.reset_counters()
+            fallbacks = await run_summaries(adapter, steps, args.summaries)
+            print(f"  {label:<24} fallbacks={fallbacks:<4} LLM requests={stub.requests}")
+        print(f"\n📈 summary-metrics \"parse\": {parse_stats.stats()}")
+        await ollama_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10000)
+    parser.add_argument("--summaries", type=int, default=200)
+    parser.add_argument("--malformed-every", type=int, default=5)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Streaming Summary Time-to-First-Field Benchmark
+
+Against the stub Ollama server (tests/stub_ollama.py), which spreads the
+canned summary over --llm-delay seconds when streaming, compares:
+
+  blocking    adapter.summarize - nothing usable until the whole completion
+  streaming   adapter.summarize_stream - time until the first field, and
+              until main_complaint, which the dashboard shows first
+
+Usage:
+    cd tests && python bench_summary_stream.py --llm-delay 2 --iterations 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+from typing import Dict, List
+
+from backend_bench import setup_backend, print_stats, sample_steps
+from stub_ollama import StubOllama
+
+setup_backend("summary_stream")
+
+from app.summary import ollama_client  # noqa: E402
+from app.summary.base import get_summary_adapter  # noqa: E402
+from app.summary.cache import summary_cache  # noqa: E402
+
+
+async def blocking(adapter, steps) -> float:
+    start = time.perf_counter()
+    await adapter.summarize(steps)
+    return (time.perf_counter() - start) * 1000
+
+
+async def streaming(adapter, steps) -> Dict[str, float]:
+    start = time.perf_counter()
+    marks: Dict[str, float] = {}
+    async for name, _ in adapter.summarize_stream(steps):
+        elapsed = (time.perf_counter() - start) * 1000
+        marks.setdefault("first field", elapsed)
+        if name == "main_complaint":
+            marks["main_complaint"] = elapsed
+    marks["all fields"] = (time.perf_counter() - start) * 1000
+    return marks
+
+
+async def main_async(args) -> None:
+    print("⏱️  Streaming Summary Time-to-First-Field Benchmark")
+    print("=" * 70)
+    steps = sample_steps(8)
+
+    with StubOllama(delay=args.llm_delay) as stub:
+        os.environ["OLLAMA_BASE_URL"] = stub.url
+        print(f"Stub Ollama: {stub.url} (generation {args.llm_delay * 1000:.0f}ms)")
+        await ollama_client.start()
+
+        for provider in ("ollama", "rag"):
+            os.environ["LLM_PROVIDER"] = provider
+            adapter = get_summary_adapter()
+            results: Dict[str, List[float]] = {"blocking": [], "first field": [], "main_complaint": [], "all fields": []}
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(args.iterations):
+                    summary_cache.clear()
+                    results["blocking"].append(await blocking(adapter, steps))
+                    summary_cache.clear()
+                    for label, ms in (await streaming(adapter, steps)).items():
+                        results[label].append(ms)
+
+            print(f"\n📊 {provider} adapter, {args.iterations} iterations")
+            for label, samples in results.items():
+                print_stats(("streaming: " if label != "blocking" else "") + label, samples)
+
+        await ollama_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--llm-delay", type=float, default=2.0, help="stub generation time in seconds")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Minimal stand-in for the Ollama HTTP API, for benchmarks that must not depend
+on a real model. POST /api/generate answers with a canned summary after an
+optional delay; with "stream": true the summary arrives as NDJSON chunks
+of a few characters spread evenly over the delay. The server counts TCP connections so callers can see whether
+keep-alive is being reused.
+
+With load_delay set, the stub also plays Ollama's model residency: a request
+for a model that is not loaded first waits load_delay (reported as
+load_duration), and the model then stays loaded for the request's
+keep_alive, or default_keep_alive seconds without one. A request without a
+prompt only loads the model, like Ollama's preload call.
+
+Setting stub.down = True simulates a hung Ollama: requests are accepted but
+get no answer until it is set back to False.
+
+With malformed_every=N, every Nth generation answers with broken JSON
+wrapped in prose, the way a model without format constraints sometimes does.
+
+    with StubOllama(delay=0.05) as stub:
+        os.environ["OLLAMA_BASE_URL"] = stub.url
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_SUMMARY = {
+    "patient_info": "Name: John Doe; DOB: 03/15/1985; Contact: 555-123-4567",
+    "main_complaint": "Headache and fever for the past week",
+    "symptom_onset": "Started last Monday",
+    "relevant_history": ["Hypertension since 2020"],
+    "allergies": ["Penicillin"],
+    "red_flags": [],
+}
+
+
+STREAM_TOKEN_CHARS = 4
+PREFILL_NS_PER_TOKEN = 100_000  # reported prefill speed, 10k tokens/sec; nothing actually waits on it
+
+
+def prefill_stats(request) -> dict:
+    """Ollama's prompt accounting for the closing response object, at roughly four characters per token"""
+    tokens = max(1, len(request.get("prompt", "")) // 4)
+    return {"prompt_eval_count": tokens, "prompt_eval_duration": tokens * PREFILL_NS_PER_TOKEN}
+
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def keep_alive_seconds(value, default: float) -> float:
+    """Ollama's keep_alive (seconds, or a duration such as "30m"; negative = forever) in seconds"""
+    if value is None:
+        return default
+    if isinstance(value, str) and value[-1:] in DURATION_UNITS:
+        seconds = float(value[:-1]) * DURATION_UNITS[value[-1]]
+    else:
+        seconds = float(value)
+    return float("inf") if seconds < 0 else seconds
+
+
+class _Server(ThreadingHTTPServer):
+    # socketserver's default backlog of 5 resets connections under the load benchmarks
+    request_queue_size = 128
+
+
+class StubOllama:
+    def __init__(
+        self,
+        delay: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        load_delay: float = 0.0,
+        default_keep_alive: float = 300.0,
+        malformed_every: int = 0,
+    ):
+        self.delay = delay
+        self.load_delay = load_delay
+        self.default_keep_alive = default_keep_alive
+        self.malformed_every = malformed_every
+        self.down = False
+        self.generations = 0
+        self.last_request = None
+        self.connections = 0
+        self.requests = 0
+        self.loads = 0
+        self._loaded_until = {}  # model -> time.monotonic() it unloads
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler())
+        self._server.daemon_threads = True
+        # Clients that timed out during an outage leave broken pipes behind; not worth a traceback
+        self._server.handle_error = lambda request, client_address: None
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+            self.loads = 0
+            self.generations = 0
+
+    def unload(self) -> None:
+        with self._load_lock:
+            self._loaded_until.clear()
+
+    def _response_text(self) -> str:
+        with self._lock:
+            self.generations += 1
+            malformed = self.malformed_every and self.generations % self.malformed_every == 0
+        if malformed:
+            return "Sure! Here is the summary: " + json.dumps(CANNED_SUMMARY)[:-30] + " I hope this helps}"
+        return json.dumps(CANNED_SUMMARY)
+
+    def _load(self, request) -> int:
+        """Make the request's model resident; the wait in nanoseconds, like Ollama's load_duration"""
+        model = request.get("model", "stub")
+        start = time.perf_counter()
+        with self._load_lock:
+            if self.load_delay and self._loaded_until.get(model, 0.0) <= time.monotonic():
+                time.sleep(self.load_delay)
+                self.loads += 1
+            keep_alive = keep_alive_seconds(request.get("keep_alive"), self.default_keep_alive)
+            self._loaded_until[model] = time.monotonic() + keep_alive
+        return int((time.perf_counter() - start) * 1e9)
+
+    def start(self) -> "StubOllama":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubOllama":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True  # no 40ms delayed-ACK stalls on reused connections
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                while stub.down:
+                    time.sleep(0.05)
+                with stub._lock:
+                    stub.requests += 1
+                    stub.last_request = request
+                load_duration = stub._load(request)
+                if "prompt" not in request:
+                    self._send_json({"model": request.get("model", "stub"), "response": "", "done": True,
+                                     "done_reason": "load", "load_duration": load_duration})
+                    return
+                text = stub._response_text()
+                if request.get("stream"):
+                    self._stream(request, text, load_duration)
+                    return
+                if stub.delay:
+                    time.sleep(stub.delay)
+                self._send_json({
+                    "model": request.get("model", "stub"),
+                    "response": text,
+                    "done": True,
+                    "load_duration": load_duration,
+                    **prefill_stats(request),
+                })
+
+            def _send_json(self, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, request, text, load_duration):
+                tokens = [text[i:i + STREAM_TOKEN_CHARS] for i in range(0, len(text), STREAM_TOKEN_CHARS)]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, token in enumerate(tokens + [""]):
+                    if stub.delay and token:
+                        time.sleep(stub.delay / len(tokens))
+                    chunk = {"model": request.get("model", "stub"), "response": token, "done": i == len(tokens)}
+                    if chunk["done"]:
+                        chunk.update(load_duration=load_duration, **prefill_stats(request))
+                    line = json.dumps(chunk) + "\n"
+                    data = line.encode()
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler